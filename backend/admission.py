@@ -0,0 +1,260 @@
+import asyncio
+import fnmatch
+import json
+import math
+import os
+import time
+from collections import deque
+
+from metrics import counter, gauge
+
+ADMISSION_SHED = counter(
+    "skillforge_admission_shed_total",
+    "Requests turned away by admission control, by route and reason",
+    ("route", "reason"),
+)
+
+# Header carrying the client's deadline as a Unix timestamp in seconds
+DEADLINE_HEADER = b"x-request-deadline"
+
+
+class Shed(Exception):
+    """
+    A request the limiter will not run: the queue is full, it waited too
+    long, or its deadline passed
+    """
+
+    def __init__(self, reason, retry_after=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RouteLimiter:
+    """
+    At most ``limit`` requests run at once; up to ``queue_size`` more wait
+    in arrival order, each for at most ``max_wait`` seconds.
+
+    Service time is tracked as an exponentially weighted moving average, so
+    the queue's drain rate (``limit / service time``) gives a Retry-After
+    that matches the current load.
+    """
+
+    def __init__(self, limit, queue_size, max_wait, max_retry_after=60, smoothing=0.2):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.max_retry_after = max_retry_after
+        self.smoothing = smoothing
+        self.active = 0
+        self.service_time = None
+        self._waiters = deque()
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    def retry_after(self):
+        """
+        Whole seconds until the current queue (plus one) would have drained
+        """
+        if not self.service_time:
+            return 1
+        drain_rate = self.limit / self.service_time
+        seconds = math.ceil((self.queued + 1) / drain_rate)
+        return max(1, min(self.max_retry_after, seconds))
+
+    async def acquire(self, deadline=None):
+        """
+        Take a slot, waiting in the queue if needed. ``deadline`` is a
+        ``time.time()`` value after which the request is no longer wanted.
+        """
+        if deadline is not None and deadline <= time.time():
+            raise Shed("deadline")
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise Shed("queue_full", self.retry_after())
+
+        timeout = self.max_wait
+        if deadline is not None and deadline - time.time() < timeout:
+            timeout = deadline - time.time()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended
+                self.release()
+            elif waiter in self._waiters:
+                # release() drops waiters it finds cancelled
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            if deadline is not None and deadline <= time.time():
+                raise Shed("deadline")
+            raise Shed("wait_timeout", self.retry_after())
+
+    def release(self, elapsed=None):
+        if elapsed is not None:
+            if self.service_time is None:
+                self.service_time = elapsed
+            else:
+                self.service_time += self.smoothing * (elapsed - self.service_time)
+        # Hand the slot straight to the oldest waiter still waiting, if any;
+        # cancelled or timed-out ones are skipped
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionController:
+    """
+    Per-route limiters. Routes listed in ``limits`` get their own limiter;
+    all other paths share one with ``default_limit``. Paths in ``exempt``
+    (exact, or glob patterns such as ``/notifications/*/events``) are never
+    limited, and a limit of 0 disables limiting for that route.
+    """
+
+    def __init__(self, limits=None, default_limit=64, queue_size=100, max_wait=5.0,
+                 exempt=("/health",), max_retry_after=60):
+        self.exempt = {path for path in exempt if "*" not in path}
+        self.exempt_patterns = [path for path in exempt if "*" in path]
+
+        def limiter(limit):
+            return RouteLimiter(limit, queue_size, max_wait, max_retry_after) if limit > 0 else None
+
+        self.limiters = {path: limiter(limit) for path, limit in (limits or {}).items()}
+        self.default = limiter(default_limit)
+
+    def limiter_for(self, path):
+        """
+        Return ``(route label, limiter)`` for a request path; the limiter is
+        None when the path is not limited
+        """
+        if path in self.exempt:
+            return path, None
+        if path in self.limiters:
+            return path, self.limiters[path]
+        if any(fnmatch.fnmatchcase(path, pattern) for pattern in self.exempt_patterns):
+            return path, None
+        return "default", self.default
+
+    def queued(self):
+        queued = {(path,): limiter.queued for path, limiter in self.limiters.items() if limiter}
+        if self.default is not None:
+            queued[("default",)] = self.default.queued
+        return queued
+
+
+class AdmissionMiddleware:
+    """
+    Sheds load before it reaches the routes: requests beyond a route's
+    concurrency limit wait in a bounded queue, and are answered ``503``
+    with ``Retry-After`` when the queue is full or the wait runs out.
+    Requests whose ``X-Request-Deadline`` has passed, on arrival or while
+    queued, are dropped with ``504``.
+    """
+
+    def __init__(self, app, controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route, limiter = self.controller.limiter_for(scope["path"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire(request_deadline(scope))
+        except Shed as e:
+            ADMISSION_SHED.labels(route, e.reason).inc()
+            await reject(send, e)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
+
+
+def request_deadline(scope):
+    # Unparseable deadlines are ignored rather than failing the request
+    for name, value in scope["headers"]:
+        if name == DEADLINE_HEADER:
+            try:
+                deadline = float(value)
+            except ValueError:
+                return None
+            return deadline if math.isfinite(deadline) else None
+    return None
+
+
+async def reject(send, shed):
+    if shed.reason == "deadline":
+        status, detail = 504, "Request deadline expired before it could be served"
+    else:
+        status, detail = 503, "Server is overloaded; retry later"
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("ascii")),
+    ]
+    if shed.retry_after is not None:
+        headers.append((b"retry-after", str(shed.retry_after).encode("ascii")))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def parse_limits(value):
+    """
+    Parse ``/path=limit`` entries separated by commas
+    """
+    limits = {}
+    for entry in value.split(","):
+        path, _, limit = entry.partition("=")
+        if path.strip() and limit.strip():
+            limits[path.strip()] = int(limit)
+    return limits
+
+
+DEFAULT_LIMITS = (
+    "/send-connection-notification=64,"
+    "/send-connection-notifications/batch=8,"
+    "/send-password-reset=64,"
+    "/get-mentors=256,"
+    "/match-mentors=16,"
+    "/match-mentors/batch=4"
+)
+
+
+def create_admission_controller():
+    """
+    Build the admission controller from the environment
+    """
+    controller = AdmissionController(
+        limits=parse_limits(os.getenv("ADMISSION_LIMITS", DEFAULT_LIMITS)),
+        default_limit=int(os.getenv("ADMISSION_DEFAULT_LIMIT", "64")),
+        queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "100")),
+        max_wait=float(os.getenv("ADMISSION_MAX_WAIT", "5")),
+        exempt=[path.strip() for path in os.getenv("ADMISSION_EXEMPT", "/health,/metrics,/notifications/*/events").split(",") if path.strip()],
+        max_retry_after=int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "60")),
+    )
+    gauge(
+        "skillforge_admission_queued",
+        "Requests waiting for a concurrency slot, by route",
+        ("route",),
+        callback=controller.queued
+    )
+    return controller
@@ -0,0 +1,430 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Statuses after which a message never changes again
+FINAL_STATUSES = {"delivered", "failed"}
+
+# Outbox row status, as reported to subscribers
+OUTBOX_STATUSES = {
+    "pending": "queued",
+    "delivered": "delivered",
+    "retry": "retrying",
+    "dead": "failed",
+}
+
+# Message ids are uuid4 hex; a notification id joins its message ids with "-"
+MESSAGE_ID = re.compile(r"[0-9a-f]{32}")
+MAX_NOTIFICATION_MESSAGES = 8
+
+
+class MessageStatus:
+    """
+    Where one email is on its way: ``queued``, ``sending``, ``retrying``,
+    ``delivered`` or ``failed``
+    """
+
+    __slots__ = ("message_id", "kind", "status", "attempts", "error", "created_at", "updated_at", "version")
+
+    def __init__(self, message_id, kind=None, status="queued"):
+        self.message_id = message_id
+        self.kind = kind
+        self.status = status
+        self.attempts = 0
+        self.error = None
+        self.created_at = self.updated_at = time.time()
+        self.version = 0
+
+    def as_dict(self):
+        return {
+            "message_id": self.message_id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "updated_at": self.updated_at,
+            "version": self.version,
+        }
+
+
+class Notification:
+    """
+    The emails sent for one request, and the event streams watching them
+    """
+
+    __slots__ = ("notification_id", "message_ids", "created_at", "subscribers")
+
+    def __init__(self, notification_id, message_ids):
+        self.notification_id = notification_id
+        self.message_ids = message_ids
+        self.created_at = time.time()
+        self.subscribers = set()
+
+
+class Subscription:
+    """
+    One open event stream: status changes are put on ``queue`` by the event
+    loop, and ``seen`` holds the last version sent per message
+    """
+
+    def __init__(self, notification_id):
+        self.notification_id = notification_id
+        self.queue = asyncio.Queue()
+        self.seen = {}
+
+
+def overall_status(messages):
+    """
+    A notification's status from its messages' statuses
+    """
+    statuses = [message["status"] for message in messages]
+    if statuses and all(status in FINAL_STATUSES for status in statuses):
+        return "delivered" if all(status == "delivered" for status in statuses) else "failed"
+    for status in ("sending", "retrying"):
+        if status in statuses:
+            return status
+    return "queued"
+
+
+class DeliveryStatusRegistry:
+    """
+    Delivery status of recent notifications, kept in memory and pushed to
+    subscribers as it changes.
+
+    Updates arrive on mail worker and outbox threads. Each one costs a dict
+    update under a lock; only notifications someone is watching are handed
+    to the event loop, once per change, and fanned out there to every open
+    stream. Entries older than ``ttl`` seconds, or beyond ``maxsize``, are
+    forgotten unless a stream is still open on them.
+
+    A notification id is made of its message ids, so one this process never
+    tracked (sent through another worker process, or expired here) can
+    still be looked up in the outbox through ``fallback(message_ids)``.
+    Those are followed by polling every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, maxsize=100000, ttl=3600.0, fallback=None, poll_interval=0.5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.fallback = fallback
+        self.poll_interval = poll_interval
+        self._messages = OrderedDict()       # message_id -> MessageStatus, oldest first
+        self._notifications = OrderedDict()  # notification_id -> Notification, oldest first
+        self._owners = {}                    # message_id -> notification_id
+        self._subscribers = 0
+        self._lock = threading.Lock()
+        self._loop = None
+
+    @property
+    def subscribers(self):
+        # Open event streams
+        return self._subscribers
+
+    def track(self, messages):
+        """
+        Group ``(message_id, kind)`` emails under a new notification id and
+        return it
+        """
+        notification_id = "-".join(message_id for message_id, _ in messages)
+        with self._lock:
+            for message_id, kind in messages:
+                record = self._messages.get(message_id)
+                if record is None:
+                    self._messages[message_id] = MessageStatus(message_id, kind)
+                else:
+                    # A worker got to it first; keep the status it reported
+                    record.kind = kind
+                self._owners[message_id] = notification_id
+            self._notifications[notification_id] = Notification(
+                notification_id, [message_id for message_id, _ in messages]
+            )
+            self._expire()
+        return notification_id
+
+    def update(self, message_id, status, attempts=None, error=None):
+        """
+        Record a status change; safe to call from any thread
+        """
+        with self._lock:
+            record = self._messages.get(message_id)
+            if record is None:
+                record = self._messages[message_id] = MessageStatus(message_id)
+                self._expire()
+            elif record.status in FINAL_STATUSES:
+                return
+            record.status = status
+            if attempts is not None:
+                record.attempts = attempts
+            record.error = error
+            record.updated_at = time.time()
+            record.version += 1
+
+            notification = self._notifications.get(self._owners.get(message_id))
+            if notification is not None and notification.subscribers and self._loop is not None:
+                # Under the lock, so events reach the loop in the order they happened
+                self._loop.call_soon_threadsafe(
+                    self._publish, notification.notification_id, record.as_dict()
+                )
+
+    def on_sending(self, job):
+        # Mail queue hook: a worker picked up the email
+        self.update(job.message_id, "sending")
+
+    def on_outbox_status(self, message_id, status, attempts, error=None):
+        # Outbox hook: an attempt finished
+        self.update(message_id, OUTBOX_STATUSES[status], attempts, error)
+
+    def _publish(self, notification_id, event):
+        with self._lock:
+            notification = self._notifications.get(notification_id)
+            subscribers = list(notification.subscribers) if notification is not None else ()
+        for subscription in subscribers:
+            subscription.queue.put_nowait(event)
+
+    def _expire(self):
+        # Called with the lock held
+        cutoff = time.time() - self.ttl
+        for notification in self._evict(self._notifications, cutoff, lambda notification: notification.subscribers):
+            for message_id in notification.message_ids:
+                self._owners.pop(message_id, None)
+        self._evict(self._messages, cutoff, lambda record: self._watched(record.message_id))
+
+    def _evict(self, entries, cutoff, watched):
+        # Remove and return the entries older than ``cutoff`` or beyond
+        # ``maxsize``, oldest first. Watched ones are kept for their open
+        # streams, without holding back the expiry of those behind them.
+        evicted = []
+        kept = []
+        while entries:
+            key, entry = next(iter(entries.items()))
+            if entry.created_at > cutoff and len(entries) + len(kept) <= self.maxsize:
+                break
+            del entries[key]
+            (kept if watched(entry) else evicted).append((key, entry))
+        for key, entry in reversed(kept):
+            entries[key] = entry
+            entries.move_to_end(key, last=False)
+        return [entry for _, entry in evicted]
+
+    def _watched(self, message_id):
+        notification = self._notifications.get(self._owners.get(message_id))
+        return notification is not None and bool(notification.subscribers)
+
+    def _snapshot(self, notification):
+        # Called with the lock held
+        messages = []
+        for message_id in notification.message_ids:
+            record = self._messages.get(message_id)
+            messages.append(record.as_dict() if record is not None else unknown_message(message_id))
+        return {
+            "notification_id": notification.notification_id,
+            "status": overall_status(messages),
+            "messages": messages,
+        }
+
+    def status(self, notification_id):
+        """
+        Current status of a notification (or a single message id), or None
+        """
+        with self._lock:
+            snapshot = self._tracked(notification_id)
+        return snapshot if snapshot is not None else self._recorded(notification_id)
+
+    def _tracked(self, notification_id):
+        # Status from memory, or None; called with the lock held
+        notification = self._notifications.get(notification_id)
+        if notification is not None:
+            return self._snapshot(notification)
+        record = self._messages.get(notification_id)
+        if record is not None:
+            message = record.as_dict()
+            return {"notification_id": None, "status": message["status"], "messages": [message]}
+        return None
+
+    def tracks(self, notification_id):
+        with self._lock:
+            return notification_id in self._notifications
+
+    def _recorded(self, notification_id):
+        # Status from the outbox, or None when it has none of the messages.
+        # Reads SQLite: run it off the event loop.
+        if self.fallback is None:
+            return None
+        message_ids = notification_id.split("-")
+        if len(message_ids) > MAX_NOTIFICATION_MESSAGES or not all(
+            MESSAGE_ID.fullmatch(message_id) for message_id in message_ids
+        ):
+            return None
+        try:
+            rows = self.fallback(message_ids)
+        except Exception as e:
+            print(f"Error reading delivery status from the outbox: {str(e)}")
+            return None
+        if not rows:
+            return None
+        messages = []
+        for message_id in message_ids:
+            if message_id not in rows:
+                messages.append(unknown_message(message_id))
+                continue
+            kind, status, attempts, error, updated_at = rows[message_id]
+            status = OUTBOX_STATUSES.get(status, "unknown")
+            messages.append({
+                "message_id": message_id, "kind": kind, "status": status, "attempts": attempts,
+                "error": None if status == "delivered" else error, "updated_at": updated_at, "version": 0,
+            })
+        return {
+            "notification_id": notification_id,
+            "status": overall_status(messages),
+            "messages": messages,
+        }
+
+    async def recorded(self, notification_id, grace=0.5):
+        """
+        Status of a notification this process did not track, from the
+        outbox. Waits up to ``grace`` seconds for the other process to
+        commit it, as a client may ask before that.
+        """
+        deadline = time.monotonic() + grace
+        while True:
+            snapshot = await asyncio.to_thread(self._recorded, notification_id)
+            if snapshot is not None or time.monotonic() >= deadline:
+                return snapshot
+            await asyncio.sleep(0.05)
+
+    async def lookup(self, ids):
+        """
+        Status of many notifications or message ids at once; unknown ids map to None
+        """
+        with self._lock:
+            found = {identifier: self._tracked(identifier) for identifier in ids}
+        missing = [identifier for identifier, snapshot in found.items() if snapshot is None]
+        if missing:
+            # Not tracked here: one trip to a thread for all the outbox reads
+            found.update(await asyncio.to_thread(
+                lambda: {identifier: self._recorded(identifier) for identifier in missing}
+            ))
+        return found
+
+    def subscribe(self, notification_id):
+        """
+        Open an event stream on a notification. Returns the subscription and
+        the current snapshot, or None for an unknown id. Call on the event loop.
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        with self._lock:
+            notification = self._notifications.get(notification_id)
+            if notification is None:
+                return None
+            subscription = Subscription(notification_id)
+            notification.subscribers.add(subscription)
+            self._subscribers += 1
+            return subscription, self._snapshot(notification)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            notification = self._notifications.get(subscription.notification_id)
+            if notification is not None and subscription in notification.subscribers:
+                notification.subscribers.discard(subscription)
+                self._subscribers -= 1
+
+    async def events(self, notification_id, keepalive=15.0):
+        """
+        Server-sent events for a notification: each message's current status,
+        then every change, then ``done`` once all messages are final.
+
+        The subscription is opened when the stream starts, so a client that
+        leaves before then never holds one.
+        """
+        subscribed = self.subscribe(notification_id)
+        if subscribed is None:
+            # Expired here since the request came in: follow the outbox
+            snapshot = await asyncio.to_thread(self._recorded, notification_id)
+            if snapshot is not None:
+                async for event in self.poll_events(snapshot, keepalive):
+                    yield event
+            return
+        subscription, snapshot = subscribed
+        statuses = {}
+        try:
+            for message in snapshot["messages"]:
+                statuses[message["message_id"]] = message["status"]
+                subscription.seen[message["message_id"]] = message["version"]
+                yield sse("status", message)
+            while not all(status in FINAL_STATUSES or status == "unknown" for status in statuses.values()):
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield b": keepalive\n\n"
+                    continue
+                if message["version"] <= subscription.seen.get(message["message_id"], 0):
+                    continue  # already covered by the snapshot
+                subscription.seen[message["message_id"]] = message["version"]
+                statuses[message["message_id"]] = message["status"]
+                yield sse("status", message)
+            yield sse("done", {
+                "notification_id": subscription.notification_id,
+                "status": overall_status([{"status": status} for status in statuses.values()]),
+            })
+        finally:
+            self.unsubscribe(subscription)
+
+    async def poll_events(self, snapshot, keepalive=15.0):
+        """
+        Server-sent events for a notification known only from the outbox
+        (see ``recorded()``), like ``events()`` but without ``sending``
+        """
+        notification_id = snapshot["notification_id"]
+        seen = {}
+        idle = 0.0
+        while True:
+            for message in snapshot["messages"]:
+                state = (message["status"], message["attempts"])
+                if seen.get(message["message_id"]) != state:
+                    seen[message["message_id"]] = state
+                    idle = 0.0
+                    yield sse("status", message)
+            if all(message["status"] in FINAL_STATUSES or message["status"] == "unknown"
+                   for message in snapshot["messages"]):
+                break
+            await asyncio.sleep(self.poll_interval)
+            idle += self.poll_interval
+            if idle >= keepalive:
+                idle = 0.0
+                yield b": keepalive\n\n"
+            snapshot = await asyncio.to_thread(self._recorded, notification_id) or snapshot
+        yield sse("done", {"notification_id": notification_id, "status": overall_status(snapshot["messages"])})
+
+
+def unknown_message(message_id):
+    return {
+        "message_id": message_id, "kind": None, "status": "unknown",
+        "attempts": 0, "error": None, "updated_at": None, "version": 0,
+    }
+
+
+def sse(event, data):
+    """
+    Encode one server-sent event
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+def create_delivery_status(mail_queue, outbox):
+    """
+    Build a status registry fed by the mail queue and the outbox
+    """
+    registry = DeliveryStatusRegistry(
+        maxsize=int(os.getenv("DELIVERY_STATUS_MAX_ENTRIES", "100000")),
+        ttl=float(os.getenv("DELIVERY_STATUS_TTL", "3600")),
+        fallback=outbox.statuses,
+    )
+    mail_queue.add_start_listener(registry.on_sending)
+    outbox.add_listener(registry.on_outbox_status)
+    return registry
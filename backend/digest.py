@@ -0,0 +1,116 @@
+import os
+import heapq
+import threading
+import time
+
+
+class DigestCoalescer:
+    """
+    Coalesces mentor notifications per ``mentor_email`` (leading edge).
+
+    The first notification to a mentor is sent right away and opens a window
+    of ``window`` seconds. Notifications to that mentor arriving while the
+    window is open are held, and when it closes they are passed to
+    ``release(jobs)`` together so they can go out as one digest. A busy
+    mentor therefore gets at most two emails per window, while a quiet one
+    sees no extra delay.
+    """
+
+    def __init__(self, window, release):
+        self.window = window
+        self.release = release
+        self._windows = {}  # mentor email -> jobs held until the window closes
+        self._deadlines = []  # heap of (closes_at, mentor email)
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self.held = 0
+        self.coalesced = 0
+
+    def offer(self, mentor_email, job):
+        """
+        Return True if ``job`` is held for a digest, False if it should be
+        sent now (opening a new window for its mentor)
+        """
+        key = mentor_email.strip().lower()
+        with self._cond:
+            if self._stopping:
+                return False
+            held = self._windows.get(key)
+            if held is not None:
+                held.append(job)
+                self.held += 1
+                return True
+            self._windows[key] = []
+            heapq.heappush(self._deadlines, (time.monotonic() + self.window, key))
+            self._cond.notify()
+            return False
+
+    def withdraw(self, mentor_email, job):
+        """
+        Stop holding ``job``; return False if its window already closed
+        """
+        with self._cond:
+            held = self._windows.get(mentor_email.strip().lower())
+            if held is None or job not in held:
+                return False
+            held.remove(job)
+            self.held -= 1
+            return True
+
+    def start(self):
+        if self._thread:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="digest-coalescer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """
+        Release everything held without waiting for the windows to close
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _close_due(self, now):
+        due = []
+        with self._cond:
+            while self._deadlines and (self._stopping or self._deadlines[0][0] <= now):
+                _, key = heapq.heappop(self._deadlines)
+                jobs = self._windows.pop(key)
+                if jobs:
+                    due.append(jobs)
+        return due
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._deadlines:
+                        wait = self._deadlines[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                stopping = self._stopping
+            for jobs in self._close_due(time.monotonic()):
+                if len(jobs) > 1:
+                    self.coalesced += len(jobs) - 1
+                try:
+                    self.release(jobs)
+                except Exception as e:
+                    print(f"Error releasing mentor digest: {str(e)}")
+            if stopping:
+                break
+
+
+def digest_window():
+    """
+    Coalescing window in seconds from the environment (0 disables digests)
+    """
+    return float(os.getenv("DIGEST_WINDOW", "60"))
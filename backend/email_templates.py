@@ -0,0 +1,421 @@
+import base64
+import html
+import string
+import time
+import uuid
+from datetime import datetime
+from email.header import Header
+from email.utils import formatdate
+
+# Layouts are compiled once at import. Static text is stored as pre-encoded
+# UTF-8 bytes and rendering only splices in the per-recipient fields, so a
+# send never touches the email package's MIME classes or generator.
+
+MENTOR_NOTIFICATION_HTML = """\
+<html>
+  <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f4f4f4;">
+      <div style="background-color: #fff; padding: 30px; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+        <h2 style="color: #ff8c00; margin-bottom: 20px;">🎯 New Mentorship Request</h2>
+
+        <p style="font-size: 16px; margin-bottom: 15px;">
+          Hello! You have received a new mentorship connection request on <strong>SkillForge AI</strong>.
+        </p>
+
+        <div style="background-color: #f9f9f9; padding: 20px; border-left: 4px solid #ff8c00; margin: 20px 0;">
+          <p style="margin: 5px 0;"><strong>Student Name:</strong> {user_name}</p>
+          <p style="margin: 5px 0;"><strong>Student Email:</strong> {user_email}</p>
+          <p style="margin: 5px 0;"><strong>Message:</strong> {message}</p>
+          <p style="margin: 5px 0;"><strong>Date:</strong> {date}</p>
+        </div>
+
+        <p style="font-size: 14px; margin-top: 20px;">
+          You can reach out to the student directly at <a href="mailto:{user_email}" style="color: #ff8c00;">{user_email}</a> to discuss mentorship opportunities.
+        </p>
+
+        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+
+        <p style="font-size: 12px; color: #666; text-align: center;">
+          This is an automated notification from SkillForge AI<br>
+          Smart Career Path Navigator
+        </p>
+      </div>
+    </div>
+  </body>
+</html>
+"""
+
+USER_CONFIRMATION_HTML = """\
+<html>
+  <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f4f4f4;">
+      <div style="background-color: #fff; padding: 30px; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+        <h2 style="color: #ff8c00; margin-bottom: 20px;">✓ Connection Request Sent!</h2>
+
+        <p style="font-size: 16px; margin-bottom: 15px;">
+          Hi {user_name},
+        </p>
+
+        <p style="font-size: 16px; margin-bottom: 15px;">
+          Your mentorship connection request has been successfully sent to <strong>{mentor_name}</strong>.
+        </p>
+
+        <div style="background-color: #f0f8ff; padding: 15px; border-radius: 5px; margin: 20px 0;">
+          <p style="margin: 0; font-size: 14px;">
+            💡 <strong>What's next?</strong><br>
+            Your mentor will review your request and may reach out to you directly via email.
+          </p>
+        </div>
+
+        <p style="font-size: 14px; margin-top: 20px;">
+          Continue exploring your learning path on SkillForge Navigator!
+        </p>
+
+        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+
+        <p style="font-size: 12px; color: #666; text-align: center;">
+          SkillForge Navigator - Your Smart Career Path Platform
+        </p>
+      </div>
+    </div>
+  </body>
+</html>
+"""
+
+PASSWORD_RESET_HTML = """\
+<html>
+  <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f4f4f4;">
+      <div style="background-color: #fff; padding: 30px; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+        <h2 style="color: #ff8c00; margin-bottom: 20px;">🔐 Password Reset Request</h2>
+
+        <p style="font-size: 16px; margin-bottom: 15px;">
+          Hi {user_name},
+        </p>
+
+        <p style="font-size: 16px; margin-bottom: 15px;">
+          We received a request to reset your password for your SkillForge Navigator account.
+        </p>
+
+        <div style="background-color: #fff3cd; padding: 20px; border-left: 4px solid #ff8c00; margin: 20px 0;">
+          <p style="margin: 5px 0; font-size: 14px;"><strong>Your Temporary Password:</strong></p>
+          <p style="margin: 10px 0; font-size: 20px; font-weight: bold; color: #ff8c00; letter-spacing: 2px;">{temp_password}</p>
+        </div>
+
+        <div style="background-color: #f0f8ff; padding: 15px; border-radius: 5px; margin: 20px 0;">
+          <p style="margin: 0; font-size: 14px;">
+            ⚠️ <strong>Important:</strong><br>
+            • Use this temporary password to log in<br>
+            • Change your password immediately after logging in<br>
+            • This password will work only once
+          </p>
+        </div>
+
+        <p style="font-size: 14px; margin-top: 20px;">
+          If you didn't request this password reset, please contact support immediately.
+        </p>
+
+        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+
+        <p style="font-size: 12px; color: #666; text-align: center;">
+          SkillForge AI - Smart Career Path Navigator<br>
+          This is an automated email. Please do not reply.
+        </p>
+      </div>
+    </div>
+  </body>
+</html>
+"""
+
+MENTOR_NOTIFICATION_TEXT = """\
+New Mentorship Request
+
+Hello! You have received a new mentorship connection request on SkillForge AI.
+
+Student Name: {user_name}
+Student Email: {user_email}
+Message: {message}
+Date: {date}
+
+You can reach out to the student directly at {user_email} to discuss mentorship opportunities.
+
+--
+This is an automated notification from SkillForge AI
+Smart Career Path Navigator
+"""
+
+USER_CONFIRMATION_TEXT = """\
+Connection Request Sent!
+
+Hi {user_name},
+
+Your mentorship connection request has been successfully sent to {mentor_name}.
+
+What's next?
+Your mentor will review your request and may reach out to you directly via email.
+
+Continue exploring your learning path on SkillForge Navigator!
+
+--
+SkillForge Navigator - Your Smart Career Path Platform
+"""
+
+PASSWORD_RESET_TEXT = """\
+Password Reset Request
+
+Hi {user_name},
+
+We received a request to reset your password for your SkillForge Navigator account.
+
+Your Temporary Password: {temp_password}
+
+Important:
+- Use this temporary password to log in
+- Change your password immediately after logging in
+- This password will work only once
+
+If you didn't request this password reset, please contact support immediately.
+
+--
+SkillForge AI - Smart Career Path Navigator
+This is an automated email. Please do not reply.
+"""
+
+MENTOR_DIGEST_HTML = """\
+<html>
+  <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f4f4f4;">
+      <div style="background-color: #fff; padding: 30px; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+        <h2 style="color: #ff8c00; margin-bottom: 20px;">🎯 {count} New Mentorship Requests</h2>
+
+        <p style="font-size: 16px; margin-bottom: 15px;">
+          Hello! You have received {count} new mentorship connection requests on <strong>SkillForge AI</strong>.
+        </p>
+{rows}
+        <p style="font-size: 14px; margin-top: 20px;">
+          You can reach out to each student directly by email to discuss mentorship opportunities.
+        </p>
+
+        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+
+        <p style="font-size: 12px; color: #666; text-align: center;">
+          This is an automated digest from SkillForge AI<br>
+          Smart Career Path Navigator
+        </p>
+      </div>
+    </div>
+  </body>
+</html>
+"""
+
+MENTOR_DIGEST_ROW_HTML = """\
+        <div style="background-color: #f9f9f9; padding: 20px; border-left: 4px solid #ff8c00; margin: 20px 0;">
+          <p style="margin: 5px 0;"><strong>Student Name:</strong> {user_name}</p>
+          <p style="margin: 5px 0;"><strong>Student Email:</strong> <a href="mailto:{user_email}" style="color: #ff8c00;">{user_email}</a></p>
+          <p style="margin: 5px 0;"><strong>Message:</strong> {message}</p>
+          <p style="margin: 5px 0;"><strong>Date:</strong> {date}</p>
+        </div>
+"""
+
+MENTOR_DIGEST_TEXT = """\
+{count} New Mentorship Requests
+
+Hello! You have received {count} new mentorship connection requests on SkillForge AI.
+{rows}
+You can reach out to each student directly by email to discuss mentorship opportunities.
+
+--
+This is an automated digest from SkillForge AI
+Smart Career Path Navigator
+"""
+
+MENTOR_DIGEST_ROW_TEXT = """\
+
+Student Name: {user_name}
+Student Email: {user_email}
+Message: {message}
+Date: {date}
+"""
+
+# base64 output never contains "_", so this cannot collide with a body line
+BOUNDARY = f"=_sf_{uuid.uuid4().hex}"
+
+_date_cache = [None, ""]
+_header_date_cache = [None, ""]
+
+
+def current_date():
+    """
+    The human-readable send date used in email bodies, cached per minute
+    """
+    minute = int(time.time() // 60)
+    if _date_cache[0] != minute:
+        _date_cache[1] = datetime.now().strftime("%B %d, %Y at %I:%M %p")
+        _date_cache[0] = minute
+    return _date_cache[1]
+
+
+def _header_date():
+    second = int(time.time())
+    if _header_date_cache[0] != second:
+        _header_date_cache[1] = formatdate(second, localtime=True)
+        _header_date_cache[0] = second
+    return _header_date_cache[1]
+
+
+def _header_value(value):
+    # Strip line breaks so user input can't inject headers, and only pay for
+    # RFC 2047 encoding and folding when the value actually needs it
+    value = value.replace("\r", " ").replace("\n", " ")
+    if value.isascii() and len(value) < 900:
+        return value
+    return Header(value, "utf-8").encode(linesep="\r\n")
+
+
+def _encode_body(body):
+    return base64.encodebytes(body).replace(b"\n", b"\r\n")
+
+
+def _encode_fields(fields):
+    html_values = {}
+    text_values = {}
+    for name, value in fields.items():
+        value = str(value)
+        text_values[name] = value.encode("utf-8")
+        html_values[name] = html.escape(value).encode("utf-8")
+    return html_values, text_values
+
+
+class _CompiledText:
+    """
+    A ``str.format``-style template split into static bytes and field names
+    """
+
+    def __init__(self, source):
+        self.segments = []
+        self.fields = set()
+        for literal, field, _, _ in string.Formatter().parse(source):
+            if literal:
+                self.segments.append(literal.encode("utf-8"))
+            if field is not None:
+                self.segments.append(field)
+                self.fields.add(field)
+
+    def render(self, values):
+        return b"".join(
+            segment if segment.__class__ is bytes else values[segment]
+            for segment in self.segments
+        )
+
+
+class RenderedEmail:
+    """
+    A fully serialized message, ready for ``smtplib.SMTP.sendmail``
+    """
+
+    __slots__ = ("sender", "recipient", "subject", "raw", "text")
+
+    def __init__(self, sender, recipient, subject, raw, text=b""):
+        self.sender = sender
+        self.recipient = recipient
+        self.subject = subject
+        self.raw = raw
+        # Plaintext body, kept for transports that log instead of sending
+        self.text = text
+
+
+class EmailTemplate:
+    """
+    A subject, HTML body and plaintext body compiled into a cached
+    ``multipart/alternative`` skeleton. Templates with row sources render a
+    list of rows into their ``{rows}`` field.
+    """
+
+    def __init__(self, subject, html_source, text_source, html_row_source=None, text_row_source=None):
+        self.subject = subject
+        self.html = _CompiledText(html_source)
+        self.text = _CompiledText(text_source)
+        self.html_row = _CompiledText(html_row_source) if html_row_source else None
+        self.text_row = _CompiledText(text_row_source) if text_row_source else None
+        self.fields = self.html.fields | self.text.fields | set(
+            field for _, field, _, _ in string.Formatter().parse(subject) if field
+        )
+        self._mime_head = (
+            "MIME-Version: 1.0\r\n"
+            f'Content-Type: multipart/alternative; boundary="{BOUNDARY}"\r\n'
+            "\r\n"
+            f"--{BOUNDARY}\r\n"
+            'Content-Type: text/plain; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: base64\r\n"
+            "\r\n"
+        ).encode("ascii")
+        self._mime_middle = (
+            f"--{BOUNDARY}\r\n"
+            'Content-Type: text/html; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: base64\r\n"
+            "\r\n"
+        ).encode("ascii")
+        self._mime_tail = f"--{BOUNDARY}--\r\n".encode("ascii")
+
+    def render(self, sender, to, rows=(), **fields):
+        """
+        Render the message for one recipient. Field values are HTML-escaped
+        for the HTML part and used verbatim in the plaintext part.
+        """
+        subject = self.subject.format(**fields)
+        html_values, text_values = _encode_fields(fields)
+        if self.html_row is not None:
+            html_rows = []
+            text_rows = []
+            for row in rows:
+                row_html, row_text = _encode_fields(row)
+                html_rows.append(self.html_row.render(row_html))
+                text_rows.append(self.text_row.render(row_text))
+            html_values["rows"] = b"".join(html_rows)
+            text_values["rows"] = b"".join(text_rows)
+
+        domain = sender.rpartition("@")[2] or "localhost"
+        headers = (
+            f"From: {_header_value(sender)}\r\n"
+            f"To: {_header_value(to)}\r\n"
+            f"Subject: {_header_value(subject)}\r\n"
+            f"Date: {_header_date()}\r\n"
+            f"Message-ID: <{uuid.uuid4().hex}@{domain}>\r\n"
+        ).encode("utf-8")
+        text = self.text.render(text_values)
+        raw = b"".join((
+            headers,
+            self._mime_head,
+            _encode_body(text),
+            self._mime_middle,
+            _encode_body(self.html.render(html_values)),
+            self._mime_tail,
+        ))
+        return RenderedEmail(sender, to, subject, raw, text)
+
+
+MENTOR_NOTIFICATION = EmailTemplate(
+    "New Mentorship Connection Request from {user_name}",
+    MENTOR_NOTIFICATION_HTML,
+    MENTOR_NOTIFICATION_TEXT,
+)
+
+USER_CONFIRMATION = EmailTemplate(
+    "Connection Request Sent to {mentor_name}",
+    USER_CONFIRMATION_HTML,
+    USER_CONFIRMATION_TEXT,
+)
+
+PASSWORD_RESET = EmailTemplate(
+    "Password Reset - SkillForge Navigator",
+    PASSWORD_RESET_HTML,
+    PASSWORD_RESET_TEXT,
+)
+
+MENTOR_DIGEST = EmailTemplate(
+    "{count} New Mentorship Connection Requests",
+    MENTOR_DIGEST_HTML,
+    MENTOR_DIGEST_TEXT,
+    MENTOR_DIGEST_ROW_HTML,
+    MENTOR_DIGEST_ROW_TEXT,
+)
@@ -0,0 +1,246 @@
+import os
+import json
+import asyncio
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+from shared_state import shared_store
+
+
+class IdempotencyEntry:
+    """
+    A remembered response and the request fingerprint that produced it
+    """
+
+    __slots__ = ("fingerprint", "value", "expires_at")
+
+    def __init__(self, fingerprint, value, expires_at):
+        self.fingerprint = fingerprint
+        self.value = value
+        self.expires_at = expires_at
+
+
+class IdempotencyCache:
+    """
+    Bounded TTL + LRU cache of responses keyed by idempotency key.
+
+    ``hits`` counts requests answered from the cache (each one a send that
+    did not happen) and ``misses`` counts requests that went through.
+    """
+
+    def __init__(self, maxsize=10000, ttl=600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, fingerprint, value):
+        self._entries[key] = IdempotencyEntry(fingerprint, value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def discard(self, key):
+        self._entries.pop(key, None)
+
+    async def claim(self, key, fingerprint, value):
+        """
+        Return the live entry for ``key``, or store ``value`` under it and
+        return None
+        """
+        entry = self.get(key)
+        if entry is None:
+            self.put(key, fingerprint, value)
+        return entry
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+class OriginalRequestFailed(Exception):
+    """
+    A repeat whose original, running in another worker process, failed or
+    did not finish in time; the repeat should be retried
+    """
+
+
+class SharedIdempotencyCache:
+    """
+    Idempotency cache in the shared store, so a repeat is recognised by
+    whichever worker process receives it.
+
+    ``claim()`` looks up and records a key in one transaction. Writes wait
+    on the store's lock, so they run in a thread, off the event loop. Entries
+    claimed here keep their outcome future in memory, as in
+    ``IdempotencyCache``; the response is written to the store once the
+    future resolves. Repeats of a request running in another process poll
+    the store for its response for up to ``pending_timeout`` seconds.
+    Over ``maxsize`` entries the oldest are evicted first.
+
+    ``hits`` and ``misses`` count this process's lookups; ``stats()``
+    reports those of all processes.
+    """
+
+    def __init__(self, store, maxsize=10000, ttl=600.0, pending_timeout=30.0, poll_interval=0.02):
+        self.store = store
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.pending_timeout = pending_timeout
+        self.poll_interval = poll_interval
+        self.hits = 0
+        self.misses = 0
+        self._outcomes = {}  # key -> outcome future of a request running here
+        self._claims = 0
+        with store.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                [("idempotency_hits",), ("idempotency_misses",)],
+            )
+
+    def __len__(self):
+        return self.store.connection().execute(
+            "SELECT COUNT(*) FROM idempotency WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+    async def claim(self, key, fingerprint, value):
+        row = await asyncio.to_thread(self._claim, key, fingerprint)
+        if row is None:
+            self.misses += 1
+            self._outcomes[key] = value
+            value.add_done_callback(lambda outcome: self._finished(key, outcome))
+            return None
+
+        self.hits += 1
+        entry_fingerprint, response, expires_at = row
+        if key in self._outcomes:
+            outcome = self._outcomes[key]
+        elif response is not None:
+            outcome = asyncio.get_running_loop().create_future()
+            outcome.set_result(tuple(json.loads(response)))
+        else:
+            outcome = self._wait(key)
+        return IdempotencyEntry(entry_fingerprint, outcome, expires_at)
+
+    def _claim(self, key, fingerprint):
+        # The live row for ``key``, or None after recording a new claim
+        now = time.time()
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, response, expires_at FROM idempotency WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[2] > now:
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'idempotency_hits'")
+            else:
+                row = None
+                conn.execute(
+                    "INSERT OR REPLACE INTO idempotency (key, fingerprint, response, expires_at) VALUES (?, ?, NULL, ?)",
+                    (key, fingerprint, now + self.ttl),
+                )
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'idempotency_misses'")
+                self._claims += 1
+                if self._claims % 100 == 0:
+                    self._evict(conn, now)
+        return row
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM idempotency WHERE key IN "
+            "(SELECT key FROM idempotency ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+    def _finished(self, key, outcome):
+        if self._outcomes.get(key) is outcome:
+            del self._outcomes[key]
+        if outcome.cancelled() or outcome.exception() is not None:
+            return  # discarded by the caller
+        # A done callback can't await; repeats poll until the write lands
+        asyncio.get_running_loop().run_in_executor(None, self._store_response, key, json.dumps(outcome.result()))
+
+    def _store_response(self, key, response):
+        try:
+            with self.store.transaction() as conn:
+                conn.execute("UPDATE idempotency SET response = ? WHERE key = ?", (response, key))
+        except sqlite3.Error as e:
+            print(f"Error storing idempotent response: {str(e)}")
+
+    async def _wait(self, key):
+        deadline = time.monotonic() + self.pending_timeout
+        conn = self.store.connection()
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            row = conn.execute("SELECT response FROM idempotency WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                raise OriginalRequestFailed("The original request failed; retry it")
+            if row[0] is not None:
+                return tuple(json.loads(row[0]))
+        raise OriginalRequestFailed("The original request is still in progress; retry later")
+
+    async def discard(self, key):
+        self._outcomes.pop(key, None)
+        await asyncio.to_thread(self._delete, key)
+
+    def _delete(self, key):
+        with self.store.transaction() as conn:
+            conn.execute("DELETE FROM idempotency WHERE key = ?", (key,))
+
+    def stats(self):
+        conn = self.store.connection()
+        counts = dict(conn.execute(
+            "SELECT name, value FROM counters WHERE name IN ('idempotency_hits', 'idempotency_misses')"
+        ).fetchall())
+        hits, misses = counts.get("idempotency_hits", 0), counts.get("idempotency_misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+def fingerprint(*values):
+    """
+    Stable hash of request values, insensitive to outer whitespace
+    """
+    canonical = json.dumps([str(v).strip() for v in values], ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def create_idempotency_cache():
+    """
+    Build an idempotency cache sized from the environment, shared between
+    worker processes when the server runs several
+    """
+    maxsize = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+    ttl = float(os.getenv("IDEMPOTENCY_TTL", "600"))
+    store = shared_store()
+    if store is not None:
+        return SharedIdempotencyCache(store, maxsize=maxsize, ttl=ttl)
+    return IdempotencyCache(maxsize=maxsize, ttl=ttl)
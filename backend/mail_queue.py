@@ -0,0 +1,293 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+from email_service import send_mentor_notification, send_user_confirmation, send_password_reset_email, send_batch, send_mentor_digest
+from rate_limit import DeliveryScheduler, create_delivery_scheduler, STOP_LANE
+from digest import DigestCoalescer, digest_window
+from metrics import EMAILS_TOTAL, EMAILS_IN_FLIGHT
+
+# Email kinds the queue knows how to deliver, mapped to their send function
+SENDERS = {
+    "mentor_notification": send_mentor_notification,
+    "user_confirmation": send_user_confirmation,
+    "password_reset": send_password_reset_email,
+}
+
+# Parameter holding each kind's recipient, used for per-domain rate limits
+RECIPIENT_FIELDS = {
+    "mentor_notification": "mentor_email",
+    "user_confirmation": "user_email",
+    "password_reset": "user_email",
+}
+
+# Delivery lane per kind; lower lanes are always served first
+PRIORITIES = {
+    "password_reset": 0,
+}
+DEFAULT_PRIORITY = 1
+
+
+class QueueFullError(Exception):
+    """
+    Raised when the outbound queue is at capacity
+    """
+
+
+class MailJob:
+    """
+    A single outbound email waiting for a worker
+    """
+
+    def __init__(self, kind, params, message_id=None):
+        self.message_id = message_id or uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.enqueued_at = time.monotonic()
+        self.created_at = time.time()
+        self.priority = PRIORITIES.get(kind, DEFAULT_PRIORITY)
+        self.recipient = params.get(RECIPIENT_FIELDS.get(kind), "")
+        # Resolved with the send function's result dict once delivered
+        self.future = Future()
+
+
+class MailBatch:
+    """
+    Jobs one worker delivers together over a single SMTP session
+    """
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+
+class MailDigest:
+    """
+    Mentor notifications to one mentor delivered as a single digest email
+    """
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+
+class MailQueue:
+    """
+    Bounded in-process outbound mail queue drained by worker threads.
+
+    The send functions in ``email_service`` block on the network, so they run
+    on dedicated threads while request handlers only pay for a queue put.
+    Jobs are handed to workers by a ``DeliveryScheduler``, which applies the
+    priority lanes and rate limits; the default one has no limits. With a
+    ``digest_window`` mentor notifications pass through a ``DigestCoalescer``.
+    """
+
+    def __init__(self, maxsize=1000, workers=4, senders=None, batch_sender=None,
+                 scheduler=None, digest_window=0, digest_sender=None):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.senders = senders or SENDERS
+        # Takes [(kind, params), ...] and returns one result per item
+        self.batch_sender = batch_sender or (send_batch if senders is None else None)
+        # Takes (mentor_email, [request dicts]) and returns a single result
+        self.digest_sender = digest_sender or (send_mentor_digest if senders is None else None)
+        self._queue = scheduler or DeliveryScheduler(maxsize, account_rate=0, domain_rate=0)
+        self._coalescer = DigestCoalescer(digest_window, self._release_digest) if digest_window > 0 else None
+        self._threads = []
+        self._listeners = []
+        self._start_listeners = []
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def add_listener(self, callback):
+        """
+        Register ``callback(job, result)`` to run after every delivery attempt
+        """
+        self._listeners.append(callback)
+
+    def add_start_listener(self, callback):
+        """
+        Register ``callback(job)`` to run when a worker starts sending a job
+        """
+        self._start_listeners.append(callback)
+
+    def start(self):
+        if self._threads:
+            return
+        if self._coalescer:
+            self._coalescer.start()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"mail-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=10.0):
+        """
+        Let the workers finish the jobs already queued, then stop them
+        """
+        if self._coalescer:
+            self._coalescer.stop()
+        for _ in self._threads:
+            self._queue.put(None, priority=STOP_LANE)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def submit(self, kind, message_id=None, **params):
+        """
+        Queue an email for delivery and return its ``MailJob`` without waiting
+        """
+        if kind not in self.senders:
+            raise ValueError(f"Unknown email kind: {kind}")
+        job = MailJob(kind, params, message_id)
+        if kind == "mentor_notification" and self._coalescer and self._coalescer.offer(job.recipient, job):
+            return job
+        try:
+            self._queue.put(job, job.priority, _sender_account(), [job.recipient])
+        except queue.Full:
+            raise QueueFullError(f"Mail queue is full ({self.maxsize} messages)")
+        return job
+
+    def submit_batch(self, items):
+        """
+        Queue ``(kind, message_id, params)`` emails to be delivered together
+        by one worker, and return their ``MailJob`` objects. Mentor
+        notifications go through the digest windows as in ``submit()``.
+        """
+        for kind, _, _ in items:
+            if kind not in self.senders:
+                raise ValueError(f"Unknown email kind: {kind}")
+        jobs = [MailJob(kind, params, message_id) for kind, message_id, params in items]
+        if self._coalescer:
+            if self._queue.qsize() >= self.maxsize:
+                # Before any job is held, so a full queue fails the whole batch
+                raise QueueFullError(f"Mail queue is full ({self.maxsize} messages)")
+            held = [
+                job for job in jobs
+                if job.kind == "mentor_notification" and self._coalescer.offer(job.recipient, job)
+            ]
+        else:
+            held = []
+        held_ids = {job.message_id for job in held}
+        sending = [job for job in jobs if job.message_id not in held_ids]
+        if not sending:
+            return jobs
+        account = _sender_account()
+        recipients = [job.recipient for job in sending]
+        # One batch per chunk that fits the rate limit bursts
+        chunks = [[sending[index] for index in chunk] for chunk in self._queue.chunks(account, recipients)]
+        try:
+            self._queue.put_many(
+                [(MailBatch(chunk), [job.recipient for job in chunk]) for chunk in chunks],
+                min(job.priority for job in sending),
+                account
+            )
+        except queue.Full:
+            for job in held:
+                self._coalescer.withdraw(job.recipient, job)
+            raise QueueFullError(f"Mail queue is full ({self.maxsize} messages)")
+        return jobs
+
+    def _release_digest(self, jobs):
+        # Called by the coalescer when a mentor's window closes
+        item = jobs[0] if len(jobs) == 1 else MailDigest(jobs)
+        try:
+            self._queue.put(item, jobs[0].priority, _sender_account(), [jobs[0].recipient])
+        except queue.Full:
+            # Fail the jobs so their owners (e.g. the outbox) retry them later
+            for job in jobs:
+                self._complete(job, {"success": False, "message": f"Mail queue is full ({self.maxsize} messages)"})
+
+    def _send_digest(self, jobs):
+        if self.digest_sender is None:
+            return [self._send_one(job) for job in jobs]
+        requests = [
+            {
+                "user_name": job.params["user_name"],
+                "user_email": job.params["user_email"],
+                "message": job.params["message"],
+                "date": datetime.fromtimestamp(job.created_at).strftime("%B %d, %Y at %I:%M %p"),
+            }
+            for job in jobs
+        ]
+        try:
+            result = self.digest_sender(jobs[0].params["mentor_email"], requests)
+        except Exception as e:
+            result = {"success": False, "message": str(e)}
+        return [result] * len(jobs)
+
+    def _send_one(self, job):
+        try:
+            return self.senders[job.kind](**job.params)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    def _send_batch(self, jobs):
+        if self.batch_sender is None:
+            return [self._send_one(job) for job in jobs]
+        try:
+            return self.batch_sender([(job.kind, job.params) for job in jobs])
+        except Exception as e:
+            return [{"success": False, "message": str(e)}] * len(jobs)
+
+    def _started(self, jobs):
+        for callback in self._start_listeners:
+            for job in jobs:
+                try:
+                    callback(job)
+                except Exception as e:
+                    print(f"Error in mail queue listener: {str(e)}")
+
+    def _complete(self, job, result):
+        EMAILS_TOTAL.labels(job.kind, "success" if result.get("success") else "failure").inc()
+        for callback in self._listeners:
+            try:
+                callback(job, result)
+            except Exception as e:
+                print(f"Error in mail queue listener: {str(e)}")
+        job.future.set_result(result)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self._started(item.jobs if isinstance(item, (MailBatch, MailDigest)) else [item])
+            if isinstance(item, MailBatch):
+                EMAILS_IN_FLIGHT.inc(len(item.jobs))
+                results = self._send_batch(item.jobs)
+                EMAILS_IN_FLIGHT.dec(len(item.jobs))
+                for job, result in zip(item.jobs, results):
+                    self._complete(job, result)
+            elif isinstance(item, MailDigest):
+                EMAILS_IN_FLIGHT.inc()
+                results = self._send_digest(item.jobs)
+                EMAILS_IN_FLIGHT.dec()
+                for job, result in zip(item.jobs, results):
+                    self._complete(job, result)
+            else:
+                EMAILS_IN_FLIGHT.inc()
+                result = self._send_one(item)
+                EMAILS_IN_FLIGHT.dec()
+                self._complete(item, result)
+
+
+def _sender_account():
+    return os.getenv("SMTP_EMAIL", "noreply@skillforge.ai")
+
+
+def create_mail_queue():
+    """
+    Build a rate-limited mail queue sized from the environment
+    """
+    maxsize = int(os.getenv("MAIL_QUEUE_MAXSIZE", "1000"))
+    return MailQueue(
+        maxsize=maxsize,
+        workers=int(os.getenv("MAIL_QUEUE_WORKERS", "4")),
+        scheduler=create_delivery_scheduler(maxsize),
+        digest_window=digest_window(),
+    )
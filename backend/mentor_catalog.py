@@ -0,0 +1,164 @@
+import os
+import csv
+import json
+import hashlib
+import heapq
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+# Default catalogue shipped next to this module
+DEFAULT_MENTORS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mentors.json")
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised for a pagination cursor the catalogue did not hand out
+    """
+
+
+class MentorPage:
+    """
+    One pre-serialized page of mentors
+    """
+
+    __slots__ = ("body", "etag", "next_cursor", "count")
+
+    def __init__(self, body, etag, next_cursor, count):
+        self.body = body
+        self.etag = etag
+        self.next_cursor = next_cursor
+        self.count = count
+
+
+class MentorCatalog:
+    """
+    Read-only mentor catalogue with an expertise -> mentor inverted index.
+
+    Each mentor is serialized to JSON once when the catalogue is built, so a
+    page is answered by joining pre-encoded byte strings. Mentors keep their
+    position from the source file, posting lists are sorted by position and
+    cursors are the position of the last mentor returned, which keeps pages
+    stable however the filters combine. Built pages are kept in a small LRU
+    cache since the catalogue never changes once loaded.
+    """
+
+    def __init__(self, mentors, cache_size=256):
+        self.mentors = list(mentors)
+        self._encoded = [json.dumps(mentor, ensure_ascii=False).encode("utf-8") for mentor in self.mentors]
+        self._ratings = [float(mentor.get("rating") or 0) for mentor in self.mentors]
+        self._by_expertise = {}
+        for position, mentor in enumerate(self.mentors):
+            for skill in mentor.get("expertise") or ():
+                postings = self._by_expertise.setdefault(skill.strip().lower(), [])
+                if not postings or postings[-1] != position:
+                    postings.append(position)
+        self._all = range(len(self.mentors))
+        self.version = hashlib.blake2b(b"\n".join(self._encoded), digest_size=8).hexdigest()
+        self.cache_size = cache_size
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.mentors)
+
+    def expertise(self):
+        """
+        Known expertise values (lowercased) with their mentor counts
+        """
+        return {skill: len(postings) for skill, postings in self._by_expertise.items()}
+
+    def _candidates(self, expertise):
+        # Positions of mentors with any of the requested expertise, ascending
+        if not expertise:
+            return self._all
+        lists = [self._by_expertise.get(skill, []) for skill in expertise]
+        if len(lists) == 1:
+            return lists[0]
+        merged = []
+        for position in heapq.merge(*lists):
+            if not merged or merged[-1] != position:
+                merged.append(position)
+        return merged
+
+    def page(self, expertise=(), min_rating=None, limit=None, cursor=None):
+        """
+        Return the ``MentorPage`` of mentors having any of ``expertise`` and a
+        rating of at least ``min_rating``, after ``cursor``, at most ``limit``
+        """
+        expertise = tuple(sorted({skill.strip().lower() for skill in expertise if skill.strip()}))
+        key = (expertise, min_rating, limit, cursor)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return page
+
+        page = self._build(expertise, min_rating, limit, cursor)
+        with self._lock:
+            self._pages[key] = page
+            while len(self._pages) > self.cache_size:
+                self._pages.popitem(last=False)
+        return page
+
+    def _build(self, expertise, min_rating, limit, cursor):
+        candidates = self._candidates(expertise)
+        start = 0
+        if cursor is not None:
+            try:
+                after = int(cursor)
+            except ValueError:
+                raise InvalidCursorError(f"Invalid cursor: {cursor}")
+            if not 0 <= after < len(self.mentors):
+                raise InvalidCursorError(f"Invalid cursor: {cursor}")
+            start = bisect_right(candidates, after)
+
+        ratings = self._ratings
+        selected = []
+        next_cursor = None
+        for index in range(start, len(candidates)):
+            position = candidates[index]
+            if min_rating is not None and ratings[position] < min_rating:
+                continue
+            if limit is not None and len(selected) == limit:
+                next_cursor = str(selected[-1])
+                break
+            selected.append(position)
+
+        encoded = self._encoded
+        body = b"[" + b",".join([encoded[position] for position in selected]) + b"]"
+        etag = '"' + hashlib.blake2b(body, digest_size=8, key=self.version.encode()).hexdigest() + '"'
+        return MentorPage(body, etag, next_cursor, len(selected))
+
+
+def load_mentors(path):
+    """
+    Load mentors from a JSON array or a CSV file. CSV files have one mentor
+    per row, with ``expertise`` separated by ``;``.
+    """
+    if path.lower().endswith(".csv"):
+        mentors = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                mentors.append({
+                    "mentor_name": row["mentor_name"],
+                    "expertise": [skill.strip() for skill in row.get("expertise", "").split(";") if skill.strip()],
+                    "score": float(row.get("score") or 0),
+                    "overlap": int(row.get("overlap") or 0),
+                    "rating": float(row.get("rating") or 0),
+                    "availability": int(row.get("availability") or 0),
+                    "email": row["email"],
+                })
+        return mentors
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def create_mentor_catalog():
+    """
+    Build the mentor catalogue from ``MENTORS_PATH``
+    """
+    return MentorCatalog(
+        load_mentors(os.getenv("MENTORS_PATH", DEFAULT_MENTORS_PATH)),
+        cache_size=int(os.getenv("MENTORS_PAGE_CACHE_SIZE", "256")),
+    )
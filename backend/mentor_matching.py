@@ -0,0 +1,148 @@
+import os
+import numpy as np
+
+# Mentors scored per block, bounding the temporary matrices to roughly
+# this many cells
+_BLOCK_CELLS = 1 << 22
+
+
+class MentorMatcher:
+    """
+    Ranks mentors for learners by expertise overlap, rating and availability.
+
+    A mentor's score for a learner is
+
+        overlap_weight * (shared skills / learner skills)
+        + rating_weight * rating / 5
+        + availability_weight * availability / 100
+
+    The skill-by-mentor incidence matrix is held in padded sparse form:
+    ``mentor_skills[m]`` lists the skill columns of mentor ``m``, padded with
+    a column that is always zero. Learners are scored as a batch by adding
+    up their skill-matrix columns for each mentor slot, one block of mentors
+    at a time, and each block's best ``k`` are merged in with
+    ``argpartition``, so memory stays bounded with 100k+ mentors.
+    """
+
+    def __init__(self, mentors, overlap_weight=0.6, rating_weight=0.25, availability_weight=0.15):
+        self.mentors = list(mentors)
+        self.overlap_weight = overlap_weight
+
+        self.skill_index = {}
+        columns = []
+        for mentor in self.mentors:
+            own = {self.skill_index.setdefault(skill.strip().lower(), len(self.skill_index))
+                   for skill in mentor.get("expertise") or ()}
+            columns.append(sorted(own))
+        padding = len(self.skill_index)  # the always-zero column
+        width = max((len(c) for c in columns), default=0)
+        self.mentor_skills = np.full((len(self.mentors), width), padding, dtype=np.int32)
+        for position, own in enumerate(columns):
+            self.mentor_skills[position, :len(own)] = own
+        # Overlaps can't exceed a mentor's skill count
+        self._overlap_dtype = np.uint8 if width < 256 else np.int32
+
+        ratings = np.array([float(m.get("rating") or 0) for m in self.mentors], dtype=np.float32)
+        availability = np.array([float(m.get("availability") or 0) for m in self.mentors], dtype=np.float32)
+        # The learner-independent part of every score
+        self.base_scores = rating_weight * ratings / 5 + availability_weight * availability / 100
+
+    def learner_matrix(self, learners):
+        """
+        Encode learner skill lists as a skills x learners 0/1 matrix (plus the
+        zero padding row); skills no mentor has are ignored
+        """
+        matrix = np.zeros((len(self.skill_index) + 1, len(learners)), dtype=self._overlap_dtype)
+        for column, skills in enumerate(learners):
+            for skill in skills:
+                row = self.skill_index.get(skill.strip().lower())
+                if row is not None:
+                    matrix[row, column] = 1
+        return matrix
+
+    def top_k(self, learners, k=5, min_overlap=1):
+        """
+        Return ``(positions, scores, overlaps)``, each learners x k, best
+        first. Slots without a mentor sharing ``min_overlap`` skills hold
+        position -1 and score -inf.
+        """
+        n_learners, n_mentors = len(learners), len(self.mentors)
+        k = max(0, min(k, n_mentors))
+        best_positions = np.full((k, n_learners), -1, dtype=np.int64)
+        best_scores = np.full((k, n_learners), -np.inf, dtype=np.float32)
+        best_overlaps = np.zeros((k, n_learners), dtype=np.int32)
+        if k == 0 or n_learners == 0:
+            return best_positions.T, best_scores.T, best_overlaps.T
+
+        learner_skills = self.learner_matrix(learners)
+        counts = np.array([max(len({s.strip().lower() for s in skills}), 1) for skills in learners], dtype=np.float32)
+        weights = self.overlap_weight / counts
+        block = max(k, _BLOCK_CELLS // max(n_learners * max(self.mentor_skills.shape[1], 1), 1))
+
+        neg_base = -self.base_scores
+        for start in range(0, n_mentors, block):
+            stop = min(start + block, n_mentors)
+            slots = self.mentor_skills[start:stop]
+            # overlaps[m, l]: how many of mentor m's skills learner l has
+            overlaps = learner_skills[slots[:, 0]] if slots.shape[1] else np.zeros((stop - start, n_learners), dtype=self._overlap_dtype)
+            for slot in range(1, slots.shape[1]):
+                overlaps += learner_skills[slots[:, slot]]
+            # Negated scores, so the best are the smallest
+            costs = overlaps * -weights
+            costs += neg_base[start:stop, None]
+            costs[overlaps < min_overlap] = np.inf
+
+            if stop - start > k:
+                keep = np.argpartition(costs, k - 1, axis=0)[:k]
+            else:
+                keep = np.broadcast_to(np.arange(stop - start)[:, None], (stop - start, n_learners))
+            # Merge this block's best with the best so far, keeping the top k
+            scores = np.concatenate([best_scores, -np.take_along_axis(costs, keep, axis=0)])
+            overlaps = np.concatenate([best_overlaps, np.take_along_axis(overlaps, keep, axis=0)])
+            positions = np.concatenate([best_positions, keep + start])
+            keep = np.argpartition(-scores, k - 1, axis=0)[:k]
+            best_scores = np.take_along_axis(scores, keep, axis=0)
+            best_overlaps = np.take_along_axis(overlaps, keep, axis=0)
+            best_positions = np.take_along_axis(positions, keep, axis=0)
+
+        # Order the k survivors: score descending, then catalogue position
+        order = np.lexsort((best_positions, -best_scores), axis=0)
+        best_scores = np.take_along_axis(best_scores, order, axis=0).T
+        best_overlaps = np.take_along_axis(best_overlaps, order, axis=0).T
+        best_positions = np.take_along_axis(best_positions, order, axis=0).T
+        empty = np.isneginf(best_scores)
+        best_positions[empty] = -1
+        best_overlaps[empty] = 0
+        return best_positions, best_scores, best_overlaps
+
+    def match(self, learners, k=5, min_overlap=1):
+        """
+        Return, for each learner's skill list, up to ``k`` mentor dicts with
+        their computed ``score`` and ``overlap``, best first
+        """
+        positions, scores, overlaps = self.top_k(learners, k, min_overlap)
+        results = []
+        for row in range(len(learners)):
+            matches = []
+            for position, score, overlap in zip(positions[row], scores[row], overlaps[row]):
+                if position < 0:
+                    break
+                matches.append({
+                    **self.mentors[position],
+                    "score": round(float(score), 4),
+                    "overlap": int(overlap),
+                })
+            results.append(matches)
+        return results
+
+
+def create_mentor_matcher(mentors):
+    """
+    Build a matcher over ``mentors`` with score weights from the environment
+    """
+    return MentorMatcher(
+        mentors,
+        overlap_weight=float(os.getenv("MATCH_WEIGHT_OVERLAP", "0.6")),
+        rating_weight=float(os.getenv("MATCH_WEIGHT_RATING", "0.25")),
+        availability_weight=float(os.getenv("MATCH_WEIGHT_AVAILABILITY", "0.15")),
+    )
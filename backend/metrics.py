@@ -0,0 +1,309 @@
+import time
+import threading
+from bisect import bisect_left
+
+# Metrics are sharded per thread: each thread only ever writes its own
+# cells, so the hot path is a plain increment with no locks and no string
+# formatting. Scrapes sum the shards and format the Prometheus text.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Child:
+    """
+    One labelled series with a cell of ``width`` numbers per writing thread
+    """
+
+    def __init__(self, width):
+        self._width = width
+        self._local = threading.local()
+        self._cells = []
+        self._cells_lock = threading.Lock()
+
+    def _cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0] * self._width
+            with self._cells_lock:  # once per thread
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def _totals(self):
+        with self._cells_lock:
+            cells = list(self._cells)
+        return [sum(column) for column in zip(*cells)] if cells else [0] * self._width
+
+
+class _CounterChild(_Child):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount=1):
+        self._cell()[0] += amount
+
+    def dec(self, amount=1):
+        self._cell()[0] -= amount
+
+    def value(self):
+        return self._totals()[0]
+
+
+class _HistogramChild(_Child):
+    def __init__(self, buckets):
+        # One count per bucket, one for +Inf, then the sum
+        super().__init__(len(buckets) + 2)
+        self._buckets = buckets
+
+    def observe(self, value):
+        cell = self._cell()
+        cell[bisect_left(self._buckets, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self):
+        totals = self._totals()
+        return totals[:-1], totals[-1]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_text(self, values, extra=""):
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self):
+        """
+        ``(label values, numbers)`` for each series
+        """
+        with self._lock:
+            children = list(self._children.items())
+        return [(values, self._child_numbers(child)) for values, child in children]
+
+    def render(self, samples):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, numbers in samples:
+            lines.extend(self._render_sample(values, numbers))
+        return lines
+
+    def expose(self):
+        return self.render(self.samples())
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter; ``inc()`` on the metric or on ``labels(...)``
+    """
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def _child_numbers(self, child):
+        return [child.value()]
+
+    def _render_sample(self, values, numbers):
+        return [f"{self.name}{self._label_text(values)} {_number(numbers[0])}"]
+
+
+class Gauge(Counter):
+    """
+    Up/down gauge: ``inc()``/``dec()``, or a ``callback`` read at scrape time
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.callback = callback
+        super().__init__(name, documentation, labelnames)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def samples(self):
+        if self.callback is None:
+            return super().samples()
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        if isinstance(value, dict):
+            return [(values, [number]) for values, number in value.items()]
+        return [((), [value])]
+
+
+class Histogram(_Metric):
+    """
+    Latency histogram with fixed upper bounds in seconds
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return _Timer(self._default)
+
+    def _child_numbers(self, child):
+        counts, total = child.snapshot()
+        return counts + [total]
+
+    def _render_sample(self, values, numbers):
+        counts, total = numbers[:-1], numbers[-1]
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _number(bound)
+            labels = self._label_text(values, 'le="' + le + '"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("child", "started")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def snapshot(self):
+        """
+        Current totals as JSON-ready data, for merging across processes
+        """
+        return {
+            metric.name: [[list(values), numbers] for values, numbers in metric.samples()]
+            for metric in self._metrics
+        }
+
+    def expose(self, snapshots=None):
+        """
+        Prometheus text for this process or, given ``(snapshot, live)``
+        pairs from ``snapshot()`` of several processes, for their sum.
+        Gauges of processes that are no longer live are left out.
+        """
+        lines = []
+        for metric in self._metrics:
+            if snapshots is None:
+                lines.extend(metric.expose())
+                continue
+            totals = {}
+            for snapshot, live in snapshots:
+                if metric.kind == "gauge" and not live:
+                    continue
+                for values, numbers in snapshot.get(metric.name, ()):
+                    values = tuple(values)
+                    current = totals.get(values)
+                    totals[values] = numbers if current is None else [a + b for a, b in zip(current, numbers)]
+            lines.extend(metric.render(list(totals.items())))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=(), callback=None):
+    return REGISTRY.register(Gauge(name, documentation, labelnames, callback))
+
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# Metrics shared by the notification backend modules
+
+HTTP_REQUEST_SECONDS = histogram(
+    "skillforge_http_request_duration_seconds",
+    "HTTP request latency by route, method and status",
+    ("route", "method", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = gauge(
+    "skillforge_http_requests_in_flight",
+    "HTTP requests currently being handled",
+)
+SMTP_PHASE_SECONDS = histogram(
+    "skillforge_smtp_phase_duration_seconds",
+    "Time spent in each SMTP phase (dns, connect, ehlo, starttls, login, noop, send)",
+    ("phase",),
+)
+SMTP_PHASE_ERRORS = counter(
+    "skillforge_smtp_phase_errors_total",
+    "SMTP phases that raised an error",
+    ("phase",),
+)
+EMAILS_TOTAL = counter(
+    "skillforge_emails_total",
+    "Delivery attempts by email kind and outcome",
+    ("kind", "outcome"),
+)
+EMAILS_IN_FLIGHT = gauge(
+    "skillforge_emails_in_flight",
+    "Emails currently being delivered by workers",
+)
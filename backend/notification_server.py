@@ -1,10 +1,127 @@
-from fastapi import FastAPI, HTTPException
+import os
+import re
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from email_service import send_mentor_notification, send_user_confirmation, send_password_reset_email
+from pydantic import BaseModel, ValidationError
+from mail_queue import create_mail_queue, QueueFullError
+from outbox import create_outbox
+from delivery_status import create_delivery_status
+from idempotency import create_idempotency_cache, fingerprint, OriginalRequestFailed
+from mentor_catalog import create_mentor_catalog, InvalidCursorError
+from mentor_matching import create_mentor_matcher
+from admission import AdmissionMiddleware, create_admission_controller
+from metrics import REGISTRY, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, gauge
+from shared_state import create_metrics_publisher, worker_processes
 import uvicorn
 
-app = FastAPI()
+# Outbound emails are recorded in a durable outbox, then delivered by
+# background workers, never on the event loop
+mail_queue = create_mail_queue()
+outbox = create_outbox(mail_queue)
+
+# Tracks each notification's emails from queued to delivered or failed, for
+# the status lookup and the per-notification event streams
+delivery_status = create_delivery_status(mail_queue, outbox)
+
+# Loaded once; pages are served from pre-serialized bytes
+mentor_catalog = create_mentor_catalog()
+mentor_matcher = create_mentor_matcher(mentor_catalog.mentors)
+
+# Remembers recent connection notification responses so repeats don't re-send
+idempotency_cache = create_idempotency_cache()
+
+# With several worker processes, /metrics reports the sum over all of them
+metrics_publisher = create_metrics_publisher(REGISTRY)
+
+# Read at scrape time, so the request path pays nothing for them
+gauge("skillforge_mail_queue_depth", "Emails waiting for a mail worker", callback=lambda: mail_queue.depth)
+gauge("skillforge_outbox_pending_writes", "Outbox writes waiting for the next group commit", callback=lambda: outbox.pending_writes)
+gauge("skillforge_notification_subscribers", "Open delivery status event streams", callback=lambda: delivery_status.subscribers)
+gauge("skillforge_outbox_inflight", "Outbox emails handed to the mail queue and not yet reported back", callback=lambda: outbox.inflight)
+gauge(
+    "skillforge_idempotency_lookups",
+    "Idempotency cache lookups by result",
+    ("result",),
+    callback=lambda: {("hit",): idempotency_cache.hits, ("miss",): idempotency_cache.misses}
+)
+
+class MetricsMiddleware:
+    """
+    Records per-route latency and the number of requests in flight
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The route template, not the raw path, keeps the label set bounded
+            route = scope.get("route")
+            path = route.path if route is not None else "other"
+            HTTP_REQUEST_SECONDS.labels(path, scope["method"], str(status)).observe(elapsed)
+
+@asynccontextmanager
+async def lifespan(app):
+    mail_queue.start()
+    outbox.start()
+    if metrics_publisher:
+        metrics_publisher.start()
+    yield
+    outbox.stop()      # commit and dispatch everything recorded
+    mail_queue.stop()  # finish queued deliveries
+    outbox.close()     # persist their results
+    if metrics_publisher:
+        metrics_publisher.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# Largest list accepted by the batch endpoint
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+
+# Seconds a ?wait=true connection request waits for each delivery
+MENTOR_NOTIFICATION_TIMEOUT = float(os.getenv("MENTOR_NOTIFICATION_TIMEOUT", "10"))
+USER_CONFIRMATION_TIMEOUT = float(os.getenv("USER_CONFIRMATION_TIMEOUT", "10"))
+
+# Largest page of mentors and how long clients may reuse one
+MENTORS_MAX_LIMIT = int(os.getenv("MENTORS_MAX_LIMIT", "1000"))
+MENTORS_MAX_AGE = int(os.getenv("MENTORS_MAX_AGE", "60"))
+
+# Most matches returned per learner and learners per matching call
+MATCH_MAX_K = int(os.getenv("MATCH_MAX_K", "100"))
+MATCH_MAX_LEARNERS = int(os.getenv("MATCH_MAX_LEARNERS", "1000"))
+
+# Ids per status lookup, and idle seconds between event stream keepalives
+STATUS_LOOKUP_MAX_IDS = int(os.getenv("STATUS_LOOKUP_MAX_IDS", "1000"))
+NOTIFICATION_EVENTS_KEEPALIVE = float(os.getenv("NOTIFICATION_EVENTS_KEEPALIVE", "15"))
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Per-route concurrency limits; excess requests queue briefly or are shed.
+# Added first so CORS headers still reach clients on a 503.
+app.add_middleware(AdmissionMiddleware, controller=create_admission_controller())
 
 # Enable CORS
 app.add_middleware(
@@ -13,7 +130,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Idempotent-Replayed"],
 )
+app.add_middleware(MetricsMiddleware)
 
 class ConnectionRequest(BaseModel):
     user_name: str
@@ -22,34 +141,88 @@ class ConnectionRequest(BaseModel):
     mentor_email: str
     message: str
 
+class MatchRequest(BaseModel):
+    skills: list[str]
+    k: int = 5
+    min_overlap: int = 1
+
+class BatchMatchRequest(BaseModel):
+    learners: list[list[str]]
+    k: int = 5
+    min_overlap: int = 1
+
+class StatusLookupRequest(BaseModel):
+    ids: list[str]
+
 class PasswordResetRequest(BaseModel):
     email: str
     name: str
     temp_password: str
 
-@app.post("/send-connection-notification")
-async def send_connection_notification(request: ConnectionRequest):
+async def await_delivery(message_id, future, timeout):
     """
-    Send email notifications for mentor connection requests
+    Wait up to ``timeout`` seconds for the first delivery attempt of an email
+    """
+    wrapped = asyncio.wrap_future(future)
+    # asyncio.wait leaves the future alone on timeout; delivery carries on
+    done, _ = await asyncio.wait({wrapped}, timeout=timeout)
+    if not done:
+        return {
+            "success": False,
+            "message_id": message_id,
+            "status": "timeout",
+            "message": f"Delivery not confirmed within {timeout:g}s; it continues in the background"
+        }
+    result = wrapped.result()
+    return {
+        **result,
+        "message_id": message_id,
+        "status": "delivered" if result.get("success") else "retrying"
+    }
+
+async def queue_connection_notification(request, wait):
+    """
+    Queue (and with ``wait`` await) both connection emails, returning the
+    status code and body of the response
     """
     try:
-        # Send notification to mentor
-        mentor_result = send_mentor_notification(
-            request.mentor_email,
-            request.user_name,
-            request.user_email,
-            request.message
+        # Notification to mentor
+        mentor_message_id, mentor_future = outbox.record_tracked(
+            "mentor_notification",
+            mentor_email=request.mentor_email,
+            user_name=request.user_name,
+            user_email=request.user_email,
+            message=request.message
         )
         
-        # Send confirmation to user
-        user_result = send_user_confirmation(
-            request.user_email,
-            request.user_name,
-            request.mentor_name
+        # Confirmation to user
+        user_message_id, user_future = outbox.record_tracked(
+            "user_confirmation",
+            user_email=request.user_email,
+            user_name=request.user_name,
+            mentor_name=request.mentor_name
         )
         
-        return {
+        notification_id = delivery_status.track([
+            (mentor_message_id, "mentor_notification"),
+            (user_message_id, "user_confirmation")
+        ])
+        
+        if wait:
+            mentor_result, user_result = await asyncio.gather(
+                await_delivery(mentor_message_id, mentor_future, MENTOR_NOTIFICATION_TIMEOUT),
+                await_delivery(user_message_id, user_future, USER_CONFIRMATION_TIMEOUT)
+            )
+            status_code = 200
+        else:
+            mentor_result = {"message_id": mentor_message_id, "status": "queued"}
+            user_result = {"message_id": user_message_id, "status": "queued"}
+            status_code = 202
+        
+        return status_code, {
             "success": True,
+            "notification_id": notification_id,
+            "events_url": f"/notifications/{notification_id}/events",
             "mentor_notification": mentor_result,
             "user_confirmation": user_result,
             "connection_data": {
@@ -60,77 +233,287 @@ async def send_connection_notification(request: ConnectionRequest):
                 "status": "pending"
             }
         }
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/send-password-reset")
+@app.post("/send-connection-notification", status_code=202)
+async def send_connection_notification(
+    request: ConnectionRequest,
+    response: Response,
+    wait: bool = False,
+    idempotency_key: str | None = Header(None)
+):
+    """
+    Queue email notifications for mentor connection requests.
+    With ``?wait=true`` both deliveries are awaited concurrently, each with
+    its own timeout, and their results are returned with status 200.
+    
+    Repeats within the idempotency window get the original response back
+    without sending again. Requests are matched on the ``Idempotency-Key``
+    header or, without one, on user email, mentor email and message.
+    """
+    request_fingerprint = fingerprint(*request.model_dump().values())
+    if idempotency_key:
+        key = f"key:{idempotency_key}"
+    else:
+        key = "hash:" + fingerprint(request.user_email.lower(), request.mentor_email.lower(), request.message)
+    
+    outcome = asyncio.get_running_loop().create_future()
+    entry = await idempotency_cache.claim(key, request_fingerprint, outcome)
+    if entry is not None:
+        if idempotency_key and entry.fingerprint != request_fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+        # The original may still be in progress; share its outcome
+        try:
+            status_code, body = await asyncio.shield(entry.value)
+        except OriginalRequestFailed as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        response.status_code = status_code
+        response.headers["Idempotent-Replayed"] = "true"
+        return body
+    
+    try:
+        status_code, body = await queue_connection_notification(request, wait)
+    except asyncio.CancelledError:
+        outcome.cancel()
+        await idempotency_cache.discard(key)
+        raise
+    except Exception as e:
+        # Let a retry go through instead of replaying the failure
+        outcome.set_exception(e)
+        outcome.exception()  # mark retrieved when nobody else is waiting
+        await idempotency_cache.discard(key)
+        raise
+    outcome.set_result((status_code, body))
+    response.status_code = status_code
+    return body
+
+@app.get("/idempotency/stats")
+async def idempotency_stats():
+    """
+    Hit/miss counters of the connection notification idempotency cache
+    """
+    stats = idempotency_cache.stats()
+    # Every hit skipped a mentor notification and a user confirmation
+    stats["emails_saved"] = stats["hits"] * 2
+    return stats
+
+@app.post("/send-password-reset", status_code=202)
 async def send_password_reset(request: PasswordResetRequest):
     """
-    Send password reset email with temporary password
+    Queue password reset email with temporary password
     """
     try:
-        result = send_password_reset_email(
-            request.email,
-            request.name,
-            request.temp_password
+        message_id = outbox.record(
+            "password_reset",
+            user_email=request.email,
+            user_name=request.name,
+            temp_password=request.temp_password
         )
+        notification_id = delivery_status.track([(message_id, "password_reset")])
         
         return {
             "success": True,
-            "email_result": result,
-            "message": "Password reset email sent successfully"
+            "notification_id": notification_id,
+            "events_url": f"/notifications/{notification_id}/events",
+            "message_id": message_id,
+            "status": "queued",
+            "message": "Password reset email queued"
         }
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/send-connection-notifications/batch", status_code=202)
+async def send_connection_notifications_batch(requests: list[Any]):
+    """
+    Queue mentor notifications and user confirmations for many connection
+    requests at once. Items are validated individually so one bad entry only
+    fails itself; the valid emails are committed together and delivered by a
+    single worker over one SMTP session.
+    """
+    if len(requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} items")
+    
+    results = []
+    emails = []
+    for index, item in enumerate(requests):
+        try:
+            request = ConnectionRequest.model_validate(item)
+        except ValidationError as e:
+            # An item that isn't an object has an empty location
+            errors = "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"] for err in e.errors()
+            )
+            results.append({"index": index, "success": False, "error": errors})
+            continue
+        invalid = [field for field in ("user_email", "mentor_email") if not EMAIL_PATTERN.match(getattr(request, field))]
+        if invalid:
+            results.append({"index": index, "success": False, "error": f"Invalid email address: {', '.join(invalid)}"})
+            continue
+        
+        emails.append(("mentor_notification", {
+            "mentor_email": request.mentor_email,
+            "user_name": request.user_name,
+            "user_email": request.user_email,
+            "message": request.message
+        }))
+        emails.append(("user_confirmation", {
+            "user_email": request.user_email,
+            "user_name": request.user_name,
+            "mentor_name": request.mentor_name
+        }))
+        results.append({"index": index, "success": True})
+    
+    try:
+        message_ids = iter(outbox.record_batch(emails) if emails else [])
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    for result in results:
+        if result["success"]:
+            mentor_message_id, user_message_id = next(message_ids), next(message_ids)
+            result["notification_id"] = delivery_status.track([
+                (mentor_message_id, "mentor_notification"),
+                (user_message_id, "user_confirmation")
+            ])
+            result["mentor_notification"] = {"message_id": mentor_message_id, "status": "queued"}
+            result["user_confirmation"] = {"message_id": user_message_id, "status": "queued"}
+    
+    accepted = sum(1 for result in results if result["success"])
+    return {
+        "success": accepted > 0,
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results
+    }
+
+@app.get("/notifications/{notification_id}/events")
+async def notification_events(notification_id: str):
+    """
+    Stream a notification's delivery progress as server-sent events.
+    
+    Each email's current status is sent first as a ``status`` event, then
+    every change (``queued``, ``sending``, ``retrying``, ``delivered``,
+    ``failed``); a final ``done`` event carries the overall outcome and
+    the stream closes.
+    """
+    if delivery_status.tracks(notification_id):
+        events = delivery_status.events(notification_id, keepalive=NOTIFICATION_EVENTS_KEEPALIVE)
+    else:
+        # Sent through another worker process (or expired here): follow the outbox
+        snapshot = await delivery_status.recorded(notification_id)
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="Unknown notification id")
+        events = delivery_status.poll_events(snapshot, keepalive=NOTIFICATION_EVENTS_KEEPALIVE)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/notifications/status")
+async def notification_status(request: StatusLookupRequest):
+    """
+    Current delivery status of many notifications (or message ids) at once;
+    unknown or expired ids map to null
+    """
+    if len(request.ids) > STATUS_LOOKUP_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"Lookup exceeds {STATUS_LOOKUP_MAX_IDS} ids")
+    return {"notifications": await delivery_status.lookup(request.ids)}
 
 @app.get("/get-mentors")
-async def get_mentors():
-    """
-    Return list of available mentors
-    """
-    mentors = [
-        {
-            "mentor_name": "Anna Mentor",
-            "expertise": ["Python", "TensorFlow", "Machine Learning"],
-            "score": 0.9,
-            "overlap": 3,
-            "rating": 4.8,
-            "availability": 85,
-            "email": "codeivan593@gmail.com"
-        },
-        {
-            "mentor_name": "Bob Guide",
-            "expertise": ["SQL", "Data Engineering", "Python"],
-            "score": 0.85,
-            "overlap": 2,
-            "rating": 4.6,
-            "availability": 70,
-            "email": "ipavlo953@gmail.com"
-        },
-        {
-            "mentor_name": "Carol Expert",
-            "expertise": ["JavaScript", "React", "Web Development"],
-            "score": 0.75,
-            "overlap": 1,
-            "rating": 4.9,
-            "availability": 90,
-            "email": "remotasks.karan01@gmail.com"
-        },
-        {
-            "mentor_name": "David Coach",
-            "expertise": ["Cloud Architecture", "AWS", "DevOps"],
-            "score": 0.65,
-            "overlap": 1,
-            "rating": 4.7,
-            "availability": 60,
-            "email": "denniskipngeno60@gmail.com"
-        }
-    ]
-    return mentors
+async def get_mentors(
+    expertise: list[str] = Query([]),
+    min_rating: float | None = None,
+    limit: int | None = Query(None, ge=1, le=MENTORS_MAX_LIMIT),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None)
+):
+    """
+    Return list of available mentors.
+    
+    ``expertise`` (repeatable or comma-separated) keeps mentors with any of
+    the given skills and ``min_rating`` drops lower rated ones. With
+    ``limit`` the response holds at most that many mentors and, when more
+    remain, an ``X-Next-Cursor`` header to pass back as ``cursor``.
+    Responses carry an ``ETag``; a matching ``If-None-Match`` gets 304.
+    """
+    skills = [skill for value in expertise for skill in value.split(",")]
+    try:
+        page = mentor_catalog.page(skills, min_rating, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {"ETag": page.etag, "Cache-Control": f"public, max-age={MENTORS_MAX_AGE}"}
+    if page.next_cursor is not None:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if if_none_match and (if_none_match.strip() == "*" or page.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    return Response(page.body, media_type="application/json", headers=headers)
+
+def check_match_limits(k, learners):
+    if not 1 <= k <= MATCH_MAX_K:
+        raise HTTPException(status_code=422, detail=f"k must be between 1 and {MATCH_MAX_K}")
+    if learners > MATCH_MAX_LEARNERS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MATCH_MAX_LEARNERS} learners")
+
+@app.post("/match-mentors")
+async def match_mentors(request: MatchRequest):
+    """
+    Return the ``k`` best mentors for a learner's skills, best first, with
+    their computed ``score`` and ``overlap``
+    """
+    check_match_limits(request.k, 1)
+    # NumPy releases the GIL, so large catalogues don't stall the event loop
+    matches = await asyncio.to_thread(mentor_matcher.match, [request.skills], request.k, request.min_overlap)
+    return matches[0]
+
+@app.post("/match-mentors/batch")
+async def match_mentors_batch(request: BatchMatchRequest):
+    """
+    Rank mentors for many learners in one call; returns one list per learner
+    """
+    check_match_limits(request.k, len(request.learners))
+    return await asyncio.to_thread(mentor_matcher.match, request.learners, request.k, request.min_overlap)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    # Requests are accepted into the outbox only while its writer runs
+    healthy = outbox.writer_alive
+    body = {
+        "status": "healthy" if healthy else "unhealthy",
+        "mail_queue": {"depth": mail_queue.depth, "workers": mail_queue.workers},
+        "outbox": {
+            "writer": "running" if healthy else "stopped",
+            "failures": outbox.failures,
+            "last_error": outbox.last_error,
+            "pending_writes": outbox.pending_writes
+        }
+    }
+    return JSONResponse(body, status_code=200 if healthy else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus text exposition of the server's metrics
+    """
+    if metrics_publisher:
+        # Publishing writes to the shared store, which may have to wait for its lock
+        text = await asyncio.to_thread(metrics_publisher.expose)
+    else:
+        text = REGISTRY.expose()
+    return Response(text, media_type="text/plain; version=0.0.4; charset=utf-8")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    workers = worker_processes()
+    if workers > 1:
+        # Each worker imports the app itself and shares state through SHARED_STATE_PATH
+        uvicorn.run("notification_server:app", host="0.0.0.0", port=8001, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8001)
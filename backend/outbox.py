@@ -0,0 +1,412 @@
+import os
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from mail_queue import QueueFullError
+from shared_state import shared_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+# Rows the poller looks at per pass
+_POLL_BATCH = 500
+
+
+class Outbox:
+    """
+    Durable SQLite (WAL) outbox in front of the mail queue.
+
+    Every email is recorded here before it is handed to a worker. Status
+    changes are collected from all threads and written by a single writer
+    thread, one transaction (and one fsync) per group, so request handlers
+    never wait on the disk. Failed sends are retried with jittered
+    exponential backoff and dead-lettered after ``max_attempts``; anything
+    still pending when the process stopped is replayed on ``start()``.
+
+    Delivery is at-least-once: a crash between a successful send and the
+    next group commit replays that email on restart.
+
+    Row status is one of ``pending``, ``retry``, ``delivered`` or ``dead``.
+
+    With ``claim_lease`` set, several processes can share one outbox file:
+    a row is only dispatched by the process that recorded it or that
+    claimed it once due, and a claim holds it for ``claim_lease`` seconds
+    (renewed while the email is queued). Rows of a process that died are
+    picked up by another once their lease runs out.
+    """
+
+    def __init__(self, mail_queue, path="outbox.db", max_attempts=5,
+                 backoff_base=2.0, backoff_max=300.0, flush_interval=0.005,
+                 poll_interval=1.0, claim_lease=0.0):
+        self.mail_queue = mail_queue
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.claim_lease = claim_lease
+
+        self._ops = []
+        self._cond = threading.Condition()
+        self._inflight = {}  # message_id -> attempts made before this one
+        self._settling = set()  # message_ids whose new status isn't committed yet
+        self._watchers = {}  # message_id -> Future for its first delivery attempt
+        self._listeners = []
+        self._stopping = False
+        self._thread = None
+        self._readers = threading.local()
+        self.failures = 0        # consecutive failed writer passes
+        self.last_error = None
+        mail_queue.add_listener(self._on_result)
+
+    @property
+    def pending_writes(self):
+        # Recorded emails and results waiting for the next group commit
+        return len(self._ops)
+
+    @property
+    def inflight(self):
+        # Emails handed to the mail queue whose attempt hasn't reported back
+        return len(self._inflight)
+
+    @property
+    def writer_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_listener(self, callback):
+        """
+        Register ``callback(message_id, status, attempts, error)`` to run
+        after every delivery attempt, with the row's new status
+        (``delivered``, ``retry`` or ``dead``)
+        """
+        self._listeners.append(callback)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Each group commit is fsynced; batching keeps that cheap
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def statuses(self, message_ids):
+        """
+        Rows of ``message_ids`` as ``{message_id: (kind, status, attempts,
+        last_error, updated_at)}``, read from the file, so this also sees
+        emails recorded by other processes
+        """
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._readers.conn = self._connect()
+        rows = {}
+        message_ids = list(message_ids)
+        for start in range(0, len(message_ids), _POLL_BATCH):
+            chunk = message_ids[start:start + _POLL_BATCH]
+            placeholders = ", ".join("?" for _ in chunk)
+            for message_id, *row in conn.execute(
+                f"SELECT id, kind, status, attempts, last_error, updated_at FROM outbox WHERE id IN ({placeholders})",
+                chunk,
+            ):
+                rows[message_id] = tuple(row)
+        return rows
+
+    def start(self):
+        if self._thread:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="outbox-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """
+        Commit and dispatch everything recorded so far, then stop the writer
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        """
+        Persist delivery results that arrived after ``stop()``
+        """
+        with self._cond:
+            ops, self._ops = self._ops, []
+        if ops:
+            conn = self._connect()
+            try:
+                self._flush(conn, ops, dispatch=False)
+            finally:
+                conn.close()
+
+    def record(self, kind, **params):
+        """
+        Record an email for delivery and return its message id.
+
+        The row is committed by the writer's next group commit, a few
+        milliseconds later, and only then handed to the mail queue.
+        """
+        self._check_capacity(kind)
+        message_id = uuid.uuid4().hex
+        self._push(("insert", message_id, kind, json.dumps(params), time.time()))
+        return message_id
+
+    def record_tracked(self, kind, **params):
+        """
+        Like ``record()``, but also return a ``Future`` resolved with the
+        result of the first delivery attempt (later retries are not reported)
+        """
+        self._check_capacity(kind)
+        future = Future()
+        message_id = uuid.uuid4().hex
+        self._watchers[message_id] = future
+        self._push(("insert", message_id, kind, json.dumps(params), time.time()))
+        return message_id, future
+
+    def record_batch(self, items):
+        """
+        Record several ``(kind, params)`` emails committed in one transaction
+        and delivered together by one worker, returning their message ids
+        """
+        for kind, _ in items:
+            self._check_capacity(kind)
+        now = time.time()
+        rows = [(uuid.uuid4().hex, kind, json.dumps(params), now) for kind, params in items]
+        self._push(("insert_batch", rows))
+        return [row[0] for row in rows]
+
+    def _check_capacity(self, kind):
+        if kind not in self.mail_queue.senders:
+            raise ValueError(f"Unknown email kind: {kind}")
+        if self.mail_queue.depth >= self.mail_queue.maxsize:
+            raise QueueFullError(f"Mail queue is full ({self.mail_queue.maxsize} messages)")
+
+    def backoff(self, attempts):
+        """
+        Seconds to wait before retry number ``attempts``, with jitter
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return random.uniform(delay / 2, delay)
+
+    def _push(self, op):
+        with self._cond:
+            self._ops.append(op)
+            self._cond.notify()
+
+    def _on_result(self, job, result):
+        if job.message_id not in self._inflight:
+            return
+        # Until its result is committed the row still looks due; a poll in
+        # between must not dispatch it again
+        self._settling.add(job.message_id)
+        attempts = self._inflight.pop(job.message_id) + 1
+        watcher = self._watchers.pop(job.message_id, None)
+        if watcher is not None and not watcher.cancelled():
+            watcher.set_result(result)
+        now = time.time()
+        if result.get("success"):
+            status = "delivered"
+            self._push(("delivered", job.message_id, attempts, now))
+        elif attempts >= self.max_attempts:
+            status = "dead"
+            self._push(("dead", job.message_id, attempts, result.get("message"), now))
+        else:
+            status = "retry"
+            self._push(("retry", job.message_id, attempts, result.get("message"), now + self.backoff(attempts)))
+        for callback in self._listeners:
+            try:
+                callback(job.message_id, status, attempts, None if status == "delivered" else result.get("message"))
+            except Exception as e:
+                print(f"Error in outbox listener: {str(e)}")
+
+    def _dispatch(self, message_id, kind, params, attempts):
+        self._inflight[message_id] = attempts
+        try:
+            self.mail_queue.submit(kind, message_id=message_id, **params)
+        except Exception as e:
+            # Not a delivery attempt (e.g. the queue is full); try again on a later poll
+            if not isinstance(e, QueueFullError):
+                print(f"Error dispatching outbox email {message_id}: {str(e)}")
+            self._settling.add(message_id)
+            del self._inflight[message_id]
+            self._push(("retry", message_id, attempts, str(e), time.time() + self.poll_interval))
+
+    def _dispatch_batch(self, rows):
+        for message_id, _, _, _ in rows:
+            self._inflight[message_id] = 0
+        try:
+            self.mail_queue.submit_batch(
+                [(kind, message_id, json.loads(params)) for message_id, kind, params, _ in rows]
+            )
+        except Exception as e:
+            if not isinstance(e, QueueFullError):
+                print(f"Error dispatching outbox batch: {str(e)}")
+            for message_id, _, _, _ in rows:
+                self._settling.add(message_id)
+                del self._inflight[message_id]
+                self._push(("retry", message_id, 0, str(e), time.time() + self.poll_interval))
+
+    def _flush(self, conn, ops, dispatch=True):
+        inserts = [op[1:] for op in ops if op[0] == "insert"]
+        batches = [op[1] for op in ops if op[0] == "insert_batch"]
+        now = time.time()
+        with conn:
+            # Recorded rows are leased to this process until it dispatches them
+            conn.executemany(
+                "INSERT INTO outbox (id, kind, params, status, attempts, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'pending', 0, ?4 + ?5, ?4, ?4)",
+                [row + (self.claim_lease,) for row in inserts + [row for rows in batches for row in rows]],
+            )
+            for op in ops:
+                if op[0] == "delivered":
+                    # The payload is no longer needed (and may hold a temporary password)
+                    conn.execute(
+                        "UPDATE outbox SET status='delivered', attempts=?, params=NULL, updated_at=? WHERE id=?",
+                        (op[2], op[3], op[1]),
+                    )
+                elif op[0] == "dead":
+                    conn.execute(
+                        "UPDATE outbox SET status='dead', attempts=?, last_error=?, updated_at=? WHERE id=?",
+                        (op[2], op[3], op[4], op[1]),
+                    )
+                elif op[0] == "retry":
+                    conn.execute(
+                        "UPDATE outbox SET status='retry', attempts=?, last_error=?, next_attempt_at=?, updated_at=? WHERE id=?",
+                        (op[2], op[3], op[4], now, op[1]),
+                    )
+        for op in ops:
+            if op[0] in ("delivered", "dead", "retry"):
+                self._settling.discard(op[1])
+        if dispatch:
+            for message_id, kind, params, _ in inserts:
+                self._dispatch(message_id, kind, json.loads(params), 0)
+            for rows in batches:
+                self._dispatch_batch(rows)
+
+    def _dispatch_due(self, conn, statuses=("retry",), limit=_POLL_BATCH):
+        placeholders = ", ".join("?" for _ in statuses)
+        now = time.time()
+        rows = conn.execute(
+            f"SELECT id, kind, params, attempts FROM outbox WHERE status IN ({placeholders}) "
+            "AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+            (*statuses, now, limit),
+        ).fetchall()
+        rows = [row for row in rows if row[0] not in self._inflight and row[0] not in self._settling]
+        if self.claim_lease and rows:
+            # Another process may be claiming the same rows; keep the ones we won
+            claimed = []
+            with conn:
+                for row in rows:
+                    cursor = conn.execute(
+                        f"UPDATE outbox SET next_attempt_at = ? WHERE id = ? AND status IN ({placeholders}) "
+                        "AND next_attempt_at <= ?",
+                        (now + self.claim_lease, row[0], *statuses, now),
+                    )
+                    if cursor.rowcount:
+                        claimed.append(row)
+            rows = claimed
+        for message_id, kind, params, attempts in rows:
+            self._dispatch(message_id, kind, json.loads(params), attempts)
+
+    def _renew_leases(self, conn):
+        # Queued emails may wait on rate limits for longer than one lease
+        message_ids = list(self._inflight)
+        if message_ids:
+            with conn:
+                conn.executemany(
+                    "UPDATE outbox SET next_attempt_at = ? WHERE id = ? AND status IN ('pending', 'retry')",
+                    [(time.time() + self.claim_lease, message_id) for message_id in message_ids],
+                )
+
+    def _run(self):
+        conn = None
+        next_poll = time.monotonic()
+        next_renewal = time.monotonic() + self.claim_lease / 3
+        replayed = False
+        while True:
+            with self._cond:
+                while not self._ops and not self._stopping and time.monotonic() < next_poll:
+                    self._cond.wait(next_poll - time.monotonic())
+                stopping = self._stopping
+                has_ops = bool(self._ops)
+            if has_ops and not stopping and self.flush_interval:
+                # Let concurrent writers join this group commit
+                time.sleep(self.flush_interval)
+            with self._cond:
+                ops, self._ops = self._ops, []
+            try:
+                if conn is None:
+                    conn = self._connect()
+                if not replayed:
+                    # Replay whatever a previous process left undelivered
+                    self._dispatch_due(conn, statuses=("pending", "retry"), limit=-1)
+                    replayed = True
+                if ops:
+                    self._flush(conn, ops)
+                    ops = None
+                if not stopping and time.monotonic() >= next_poll:
+                    # A shared outbox also polls pending rows, whose lease
+                    # ran out because the process that recorded them died
+                    self._dispatch_due(conn, statuses=("pending", "retry") if self.claim_lease else ("retry",))
+                    next_poll = time.monotonic() + self.poll_interval
+                if self.claim_lease and time.monotonic() >= next_renewal:
+                    self._renew_leases(conn)
+                    next_renewal = time.monotonic() + self.claim_lease / 3
+                self.failures = 0
+                self.last_error = None
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                print(f"Error in outbox writer (attempt {self.failures}): {str(e)}")
+                if ops:
+                    # Rolled back: put them back ahead of anything newer
+                    with self._cond:
+                        self._ops[:0] = ops
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                if not stopping:
+                    delay = min(self.backoff_max, 0.1 * (2 ** (self.failures - 1)))
+                    with self._cond:
+                        self._cond.wait_for(lambda: self._stopping, delay)
+                    next_poll = time.monotonic()
+                    continue
+            if stopping:
+                break
+        if conn is not None:
+            conn.close()
+
+def create_outbox(mail_queue):
+    """
+    Build an outbox configured from the environment. When the server runs
+    several worker processes they share the file, each row leased to one.
+    """
+    shared = shared_store() is not None
+    return Outbox(
+        mail_queue,
+        path=os.getenv("OUTBOX_PATH", "outbox.db"),
+        max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5")),
+        backoff_base=float(os.getenv("OUTBOX_BACKOFF_BASE", "2")),
+        backoff_max=float(os.getenv("OUTBOX_BACKOFF_MAX", "300")),
+        flush_interval=float(os.getenv("OUTBOX_FLUSH_INTERVAL", "0.005")),
+        claim_lease=float(os.getenv("OUTBOX_CLAIM_LEASE", "60")) if shared else 0.0,
+    )
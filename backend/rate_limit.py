@@ -0,0 +1,273 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from shared_state import shared_store
+
+# Lane used for the stop sentinels; served only once every other lane is empty
+STOP_LANE = 99
+
+
+class TokenBucket:
+    """
+    Classic token bucket: ``rate`` tokens per second, holding at most ``burst``
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst, updated):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = updated
+
+    def wait_time(self, now, count=1):
+        """
+        Seconds until ``count`` tokens are available (0 when they are now);
+        ``count`` is capped at the burst, which is all the bucket can hold
+        """
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        need = min(count, self.burst)
+        if self.tokens >= need:
+            return 0.0
+        return (need - self.tokens) / self.rate
+
+    def take(self, count=1):
+        self.tokens -= count
+
+
+class BucketTable:
+    """
+    Token buckets by key, held in this process
+    """
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self):
+        self._buckets = {}
+
+    @contextmanager
+    def transaction(self):
+        # The scheduler's lock already serialises access
+        yield self
+
+    def bucket(self, key, rate, burst):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, burst, self.clock())
+        return bucket
+
+
+class SharedBucketTable:
+    """
+    Token buckets kept in the shared store, so every worker process draws
+    on the same per-account and per-domain limits.
+
+    A scheduler pass runs in one transaction, opened on the first bucket it
+    reads: the buckets are loaded, refilled and charged in memory, and
+    written back on commit. Bucket times are wall-clock seconds, which all
+    processes agree on.
+    """
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, store):
+        self.store = store
+        self._conn = None
+        self._stack = None
+        self._loaded = {}
+
+    @contextmanager
+    def transaction(self):
+        with ExitStack() as stack:
+            self._stack = stack
+            try:
+                yield self
+                if self._loaded:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                        [(key, bucket.tokens, bucket.updated) for key, bucket in self._loaded.items()],
+                    )
+            finally:
+                self._conn = self._stack = None
+                self._loaded = {}
+
+    def bucket(self, key, rate, burst):
+        bucket = self._loaded.get(key)
+        if bucket is not None:
+            return bucket
+        if self._conn is None:
+            self._conn = self._stack.enter_context(self.store.transaction())
+        row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+        bucket = self._loaded[key] = TokenBucket(rate, burst, self.clock())
+        if row is not None:
+            bucket.tokens, bucket.updated = min(float(burst), row[0]), row[1]
+        return bucket
+
+
+class DeliveryScheduler:
+    """
+    Priority lanes with token-bucket limits per sender account and per
+    recipient domain, used by ``MailQueue`` in place of a FIFO queue.
+
+    ``get()`` hands out the first job, lowest lane first, whose buckets hold
+    its whole charge (one token per recipient), so a lane blocked on one busy domain doesn't hold back mail to
+    other domains, and password resets are always considered before
+    connection mail. When nothing is eligible it sleeps until the earliest
+    refill instead of spinning.
+
+    Buckets live in ``buckets``, a ``BucketTable`` by default or a
+    ``SharedBucketTable`` when several processes send for the same account.
+    """
+
+    def __init__(self, maxsize=1000, account_rate=1.0, account_burst=20,
+                 domain_rate=0.5, domain_burst=10, domain_rates=None,
+                 scan_depth=64, buckets=None):
+        self.maxsize = maxsize
+        self.account_rate = account_rate
+        self.account_burst = account_burst
+        self.domain_rate = domain_rate
+        self.domain_burst = domain_burst
+        self.domain_rates = domain_rates or {}
+        self.scan_depth = scan_depth
+
+        self._lanes = {}  # priority -> deque of (item, account, {domain: count})
+        self._size = 0
+        self._buckets = buckets or BucketTable()
+        self._cond = threading.Condition()
+
+    def qsize(self):
+        return self._size
+
+    def _buckets_for(self, table, account, domains):
+        buckets = []
+        if self.account_rate > 0 and account:
+            buckets.append((table.bucket(f"account:{account}", self.account_rate, self.account_burst), None))
+        for domain, count in domains.items():
+            rate = self.domain_rates.get(domain, self.domain_rate)
+            if rate > 0:
+                buckets.append((table.bucket(f"domain:{domain}", rate, self.domain_burst), domain))
+        return buckets
+
+    def put(self, item, priority=1, account=None, recipients=()):
+        """
+        Queue ``item`` in lane ``priority``, charged to ``account`` and to the
+        domain of each recipient address. Raises ``queue.Full`` at capacity.
+        """
+        self.put_many([(item, recipients)], priority, account)
+
+    def put_many(self, items, priority=1, account=None):
+        """
+        Queue several ``(item, recipients)`` in lane ``priority``, all or
+        none. Raises ``queue.Full`` at capacity.
+        """
+        entries = [(item, account, _domains(recipients)) for item, recipients in items]
+        with self._cond:
+            if items[0][0] is not None and self._size >= self.maxsize:
+                raise queue.Full
+            self._lanes.setdefault(priority, deque()).extend(entries)
+            self._size += len(entries)
+            self._cond.notify(len(entries))
+
+    def chunks(self, account, recipients):
+        """
+        Split ``recipients`` into runs of indexes, in order, each small
+        enough that its charge fits every bucket's burst. A batch bigger
+        than a burst could otherwise never be sent at the limited rate.
+        """
+        limit_account = self.account_rate > 0 and account
+        chunks, current, counts = [], [], {}
+        for index, recipient in enumerate(recipients):
+            domain = recipient.rpartition("@")[2].lower()
+            domain_limited = domain and self.domain_rates.get(domain, self.domain_rate) > 0
+            if current and (
+                (limit_account and len(current) >= self.account_burst)
+                or (domain_limited and counts.get(domain, 0) >= self.domain_burst)
+            ):
+                chunks.append(current)
+                current, counts = [], {}
+            current.append(index)
+            counts[domain] = counts.get(domain, 0) + 1
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def get(self):
+        """
+        Block until a job may be sent without exceeding any limit, and return it
+        """
+        with self._cond:
+            while True:
+                found, value = self._take_eligible()
+                if found:
+                    return value
+                self._cond.wait(value)
+
+    def _take_eligible(self):
+        # Returns (True, item) or (False, seconds to wait; None when empty)
+        now = self._buckets.clock()
+        shortest_wait = None
+        with self._buckets.transaction() as table:
+            for priority in sorted(self._lanes):
+                lane = self._lanes[priority]
+                if priority == STOP_LANE:
+                    if lane and self._size == len(lane):
+                        self._size -= 1
+                        return True, lane.popleft()[0]
+                    continue
+                for index in range(min(len(lane), self.scan_depth)):
+                    item, account, domains = lane[index]
+                    buckets = [
+                        (bucket, domains[domain] if domain else sum(domains.values()) or 1)
+                        for bucket, domain in self._buckets_for(table, account, domains)
+                    ]
+                    # The whole charge must be available: a batch never
+                    # overdraws a bucket and delays the jobs behind it
+                    wait = max((bucket.wait_time(now, count) for bucket, count in buckets), default=0.0)
+                    if wait == 0.0:
+                        for bucket, count in buckets:
+                            bucket.take(count)
+                        del lane[index]
+                        self._size -= 1
+                        return True, item
+                    if shortest_wait is None or wait < shortest_wait:
+                        shortest_wait = wait
+        return False, shortest_wait
+
+
+def _domains(recipients):
+    # Recipient count per domain
+    domains = {}
+    for recipient in recipients:
+        domain = recipient.rpartition("@")[2].lower()
+        if domain:
+            domains[domain] = domains.get(domain, 0) + 1
+    return domains
+
+
+def create_delivery_scheduler(maxsize):
+    """
+    Build a delivery scheduler with limits from the environment (per minute;
+    0 disables a limit). ``RATE_LIMIT_DOMAIN_OVERRIDES`` takes entries such as
+    ``gmail.com=20,yahoo.com=10``. When the server runs several worker
+    processes the limits apply to all of them together.
+    """
+    store = shared_store()
+    overrides = {}
+    for entry in os.getenv("RATE_LIMIT_DOMAIN_OVERRIDES", "").split(","):
+        domain, _, per_minute = entry.partition("=")
+        if domain.strip() and per_minute.strip():
+            overrides[domain.strip().lower()] = float(per_minute) / 60
+    return DeliveryScheduler(
+        maxsize=maxsize,
+        account_rate=float(os.getenv("RATE_LIMIT_ACCOUNT_PER_MIN", "60")) / 60,
+        account_burst=int(os.getenv("RATE_LIMIT_ACCOUNT_BURST", "20")),
+        domain_rate=float(os.getenv("RATE_LIMIT_DOMAIN_PER_MIN", "30")) / 60,
+        domain_burst=int(os.getenv("RATE_LIMIT_DOMAIN_BURST", "10")),
+        domain_rates=overrides,
+        buckets=SharedBucketTable(store) if store is not None else None,
+    )
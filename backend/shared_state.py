@@ -0,0 +1,184 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    response TEXT,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_expiry ON idempotency (expires_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    pid INTEGER PRIMARY KEY,
+    ppid INTEGER NOT NULL,
+    snapshot TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class SharedStore:
+    """
+    SQLite (WAL) file holding the state the server's worker processes must
+    agree on: idempotency entries, rate limit buckets and metric totals.
+
+    Each thread gets its own connection. Writes take the database lock up
+    front (``BEGIN IMMEDIATE``) so read-modify-write sequences such as a
+    token bucket refill are atomic across processes. Commits are not
+    fsynced: this is shared memory that survives a worker restart, not a
+    record (emails are recorded in the outbox).
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+class MetricsPublisher:
+    """
+    Makes ``/metrics`` report the whole server rather than one worker.
+
+    Every ``interval`` seconds (and on each scrape) this process writes its
+    metric totals to the shared store; a scrape sums the totals of all
+    workers started by the same parent process. Counters of a worker that
+    died are kept so totals never go backwards; its gauges are dropped.
+    The request path is unchanged: it still only touches per-thread cells.
+    """
+
+    def __init__(self, store, registry, interval=1.0):
+        self.store = store
+        self.registry = registry
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def publish(self):
+        snapshot = json.dumps(self.registry.snapshot())
+        with self.store.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO metrics (pid, ppid, snapshot, updated_at) VALUES (?, ?, ?, ?)",
+                (os.getpid(), os.getppid(), snapshot, time.time()),
+            )
+
+    def expose(self):
+        """
+        Prometheus text for all workers of this server
+        """
+        self.publish()
+        rows = self.store.connection().execute(
+            "SELECT pid, snapshot FROM metrics WHERE ppid = ?", (os.getppid(),)
+        ).fetchall()
+        return self.registry.expose(
+            [(json.loads(snapshot), pid == os.getpid() or _alive(pid)) for pid, snapshot in rows]
+        )
+
+    def start(self):
+        if self._thread:
+            return
+        with self.store.transaction() as conn:
+            # Workers of earlier runs that have stopped publishing
+            conn.execute(
+                "DELETE FROM metrics WHERE ppid != ? AND updated_at < ?",
+                (os.getppid(), time.time() - 60 * self.interval),
+            )
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.publish()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.publish()
+            except sqlite3.Error as e:
+                print(f"Error publishing metrics: {str(e)}")
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def worker_processes():
+    """
+    Worker processes the server runs as (``NOTIFICATION_WORKERS``)
+    """
+    return max(1, int(os.getenv("NOTIFICATION_WORKERS", "1")))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def shared_store():
+    """
+    The store shared by the server's worker processes, or None when it runs
+    as a single process. ``SHARED_STATE_PATH`` names the file (default
+    ``shared_state.db`` when ``NOTIFICATION_WORKERS`` is above 1).
+    """
+    global _store
+    if _store is None:
+        path = os.getenv("SHARED_STATE_PATH") or ("shared_state.db" if worker_processes() > 1 else None)
+        if path is None:
+            return None
+        with _store_lock:
+            if _store is None:
+                _store = SharedStore(path)
+    return _store
+
+
+def create_metrics_publisher(registry):
+    """
+    Build a metrics publisher when state is shared, else None
+    """
+    store = shared_store()
+    if store is None:
+        return None
+    return MetricsPublisher(store, registry, interval=float(os.getenv("METRICS_PUBLISH_INTERVAL", "1")))
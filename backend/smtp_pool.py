@@ -0,0 +1,278 @@
+import os
+import socket
+import smtplib
+import threading
+import time
+import atexit
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from metrics import SMTP_PHASE_SECONDS, SMTP_PHASE_ERRORS
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+# Histogram and error counter children per phase, resolved once
+_PHASES = {
+    phase: (SMTP_PHASE_SECONDS.labels(phase), SMTP_PHASE_ERRORS.labels(phase))
+    for phase in ("dns", "connect", "ehlo", "starttls", "login", "noop", "send")
+}
+
+
+@contextmanager
+def smtp_phase(phase):
+    """
+    Time one SMTP phase into ``SMTP_PHASE_SECONDS``, counting errors
+    """
+    seconds, errors = _PHASES[phase]
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        errors.inc()
+        raise
+    finally:
+        seconds.observe(time.perf_counter() - started)
+
+
+class _TimedSMTP(smtplib.SMTP):
+    """
+    ``smtplib.SMTP`` that times name resolution and the TCP connect separately
+    """
+
+    def _get_socket(self, host, port, timeout):
+        if timeout is not None and not timeout:
+            raise ValueError("Non-blocking socket (timeout=0) is not supported")
+        with smtp_phase("dns"):
+            addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        with smtp_phase("connect"):
+            error = None
+            for family, socktype, proto, _, address in addresses:
+                sock = socket.socket(family, socktype, proto)
+                try:
+                    sock.settimeout(timeout)
+                    if self.source_address:
+                        sock.bind(self.source_address)
+                    sock.connect(address)
+                    return sock
+                except OSError as e:
+                    error = e
+                    sock.close()
+            raise error or OSError(f"getaddrinfo returned no addresses for {host}")
+
+
+class _PooledSession:
+    """
+    An authenticated SMTP session plus the bookkeeping the pool needs
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of long-lived, authenticated SMTP sessions.
+
+    Sessions are opened lazily (connect, STARTTLS, LOGIN) and returned to the
+    pool after each use. A session that has been idle longer than
+    ``noop_interval`` is health-checked with NOOP before reuse, and one idle
+    longer than ``idle_timeout`` is closed and replaced.
+    """
+
+    def __init__(self, host, port, username, password, size=4,
+                 idle_timeout=120.0, noop_interval=5.0, timeout=30.0,
+                 use_starttls=True):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.noop_interval = noop_interval
+        self.timeout = timeout
+        self.use_starttls = use_starttls
+
+        self._idle = []  # most recently used session last
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _open(self):
+        server = _TimedSMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            with smtp_phase("ehlo"):
+                server.ehlo()
+            if self.use_starttls:
+                with smtp_phase("starttls"):
+                    server.starttls()
+                    server.ehlo()
+            if self.password:
+                with smtp_phase("login"):
+                    server.login(self.username, self.password)
+        except Exception:
+            _close_quietly(server)
+            raise
+        return _PooledSession(server)
+
+    def _is_healthy(self, session, now):
+        if now - session.last_used < self.noop_interval:
+            return True
+        try:
+            with smtp_phase("noop"):
+                code, _ = session.server.noop()
+        except OSError:  # smtplib.SMTPException derives from OSError
+            return False
+        return code == 250
+
+    def _checkout(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                session = self._idle.pop()
+            if now - session.last_used > self.idle_timeout:
+                _close_quietly(session.server)
+                continue
+            if self._is_healthy(session, now):
+                return session
+            _close_quietly(session.server)
+        return self._open()
+
+    def _checkin(self, session):
+        session.last_used = time.monotonic()
+        with self._lock:
+            if not self._closed:
+                self._idle.append(session)
+                return
+        _close_quietly(session.server)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow an authenticated ``smtplib.SMTP`` session from the pool
+        """
+        self._slots.acquire()
+        try:
+            session = self._checkout()
+            try:
+                yield session.server
+            except smtplib.SMTPServerDisconnected:
+                _close_quietly(session.server)
+                raise
+            except smtplib.SMTPResponseException as e:
+                # 421 means the server is closing the channel
+                if e.smtp_code == 421:
+                    _close_quietly(session.server)
+                else:
+                    self._checkin(session)
+                raise
+            except smtplib.SMTPRecipientsRefused:
+                # The session was reset and is still usable
+                self._checkin(session)
+                raise
+            except BaseException:
+                _close_quietly(session.server)
+                raise
+            else:
+                self._checkin(session)
+        finally:
+            self._slots.release()
+
+    def _with_session(self, send):
+        # A reused session may have been dropped by the server since its last
+        # health check, so a disconnect is retried once on a fresh session
+        for attempt in range(2):
+            try:
+                with self.connection() as server:
+                    return send(server)
+            except smtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+
+    def send_message(self, msg):
+        """
+        Send an ``email.message.Message`` over a pooled session
+        """
+        def send(server):
+            with smtp_phase("send"):
+                return server.send_message(msg)
+        return self._with_session(send)
+
+    def sendmail(self, from_addr, to_addrs, raw):
+        """
+        Send an already serialized message over a pooled session
+        """
+        def send(server):
+            with smtp_phase("send"):
+                return server.sendmail(from_addr, to_addrs, raw)
+        return self._with_session(send)
+
+    def prune(self):
+        """
+        Close idle sessions that have outlived ``idle_timeout``
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [s for s in self._idle if now - s.last_used > self.idle_timeout]
+            self._idle = [s for s in self._idle if now - s.last_used <= self.idle_timeout]
+        for session in expired:
+            _close_quietly(session.server)
+
+    def close(self):
+        """
+        Close every idle session and stop pooling new ones
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for session in idle:
+            _close_quietly(session.server)
+
+
+def _close_quietly(server):
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool():
+    """
+    Return the process-wide SMTP pool, creating it from the environment
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPConnectionPool(
+                    host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+                    port=int(os.getenv("SMTP_PORT", "587")),
+                    username=os.getenv("SMTP_EMAIL", "noreply@skillforge.ai"),
+                    password=os.getenv("SMTP_PASSWORD", ""),
+                    size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+                    idle_timeout=float(os.getenv("SMTP_POOL_IDLE_TIMEOUT", "120")),
+                    noop_interval=float(os.getenv("SMTP_POOL_NOOP_INTERVAL", "5")),
+                    timeout=float(os.getenv("SMTP_TIMEOUT", "30")),
+                    use_starttls=os.getenv("SMTP_STARTTLS", "1") != "0",
+                )
+    return _pool
+
+
+@atexit.register
+def close_smtp_pool():
+    """
+    Close the process-wide SMTP pool if one was created
+    """
+    if _pool is not None:
+        _pool.close()
@@ -0,0 +1,319 @@
+import os
+import sys
+import socket
+import asyncio
+import smtplib
+import threading
+import time
+import itertools
+from collections import deque
+from dotenv import load_dotenv
+from smtp_pool import get_smtp_pool, smtp_phase
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class Transport:
+    """
+    Delivers already rendered emails (``email_templates.RenderedEmail``).
+
+    ``send`` raises on failure; ``send_many`` never raises and returns one
+    ``{"success": ..., "message": ...}`` dict per message.
+    """
+
+    name = "base"
+
+    def send(self, msg):
+        raise NotImplementedError
+
+    def send_many(self, msgs):
+        results = []
+        for msg in msgs:
+            try:
+                self.send(msg)
+                results.append({"success": True, "message": "Email sent successfully"})
+            except Exception as e:
+                results.append({"success": False, "message": str(e)})
+        return results
+
+    def close(self):
+        pass
+
+
+class SMTPTransport(Transport):
+    """
+    Sends over the shared pool of authenticated SMTP sessions
+    """
+
+    name = "smtp"
+
+    def __init__(self, pool=None):
+        self.pool = pool or get_smtp_pool()
+
+    def send(self, msg):
+        self.pool.sendmail(msg.sender, [msg.recipient], msg.raw)
+
+    def send_many(self, msgs):
+        """
+        Send several messages over as few pooled SMTP sessions as possible.
+
+        A message the server rejects fails on its own and the session carries
+        on with the next one. If the session drops, the message in flight is
+        failed and the rest continue on a fresh session, unless nothing at
+        all got through on that session, in which case the remaining messages
+        are failed too. A session found dropped on its first message (a
+        pooled one the server closed while idle) is replaced once first.
+        """
+        results = [None] * len(msgs)
+        retried = None
+        i = 0
+        while i < len(msgs):
+            started = i
+            try:
+                with self.pool.connection() as server:
+                    while i < len(msgs):
+                        try:
+                            with smtp_phase("send"):
+                                server.sendmail(msgs[i].sender, [msgs[i].recipient], msgs[i].raw)
+                            results[i] = {"success": True, "message": "Email sent successfully"}
+                        except smtplib.SMTPRecipientsRefused as e:
+                            results[i] = {"success": False, "message": str(e)}
+                        except smtplib.SMTPResponseException as e:
+                            if e.smtp_code == 421:
+                                raise
+                            results[i] = {"success": False, "message": str(e)}
+                        i += 1
+            except Exception as e:
+                print(f"Error sending email batch: {str(e)}")
+                if i == started and isinstance(e, smtplib.SMTPServerDisconnected) and retried != i:
+                    # Most likely stale; the pool has discarded it
+                    retried = i
+                    continue
+                if i == started:
+                    # No message got through on this session; don't hammer the server
+                    for j in range(i, len(msgs)):
+                        results[j] = {"success": False, "message": str(e)}
+                    break
+                results[i] = {"success": False, "message": str(e)}
+                i += 1
+        return results
+
+    def close(self):
+        self.pool.close()
+
+
+class AsyncSMTPTransport(Transport):
+    """
+    Sends through ``aiosmtplib`` clients multiplexed on one event loop thread.
+
+    Requires the optional ``aiosmtplib`` package. Callers block until their
+    message is sent, but the sockets are driven by a single thread however
+    many workers are sending.
+    """
+
+    name = "async-smtp"
+
+    def __init__(self, host, port, username, password, size=4, timeout=30.0, use_starttls=True):
+        try:
+            import aiosmtplib
+        except ImportError:
+            raise RuntimeError("MAIL_TRANSPORT=async-smtp requires the aiosmtplib package")
+        self._aiosmtplib = aiosmtplib
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.timeout = timeout
+        self.use_starttls = use_starttls
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-smtp", daemon=True)
+        self._thread.start()
+        self._clients = asyncio.run_coroutine_threadsafe(self._make_clients(), self._loop).result()
+
+    async def _make_clients(self):
+        clients = asyncio.Queue()
+        for _ in range(self.size):
+            clients.put_nowait(self._aiosmtplib.SMTP(
+                hostname=self.host,
+                port=self.port,
+                timeout=self.timeout,
+                start_tls=self.use_starttls,
+            ))
+        return clients
+
+    async def _send(self, msg):
+        client = await self._clients.get()
+        try:
+            if not client.is_connected:
+                await self._connect(client)
+            try:
+                with smtp_phase("send"):
+                    await client.sendmail(msg.sender, [msg.recipient], msg.raw)
+            except self._aiosmtplib.SMTPServerDisconnected:
+                await self._connect(client)
+                with smtp_phase("send"):
+                    await client.sendmail(msg.sender, [msg.recipient], msg.raw)
+        finally:
+            self._clients.put_nowait(client)
+
+    async def _connect(self, client):
+        # aiosmtplib resolves, connects and upgrades to TLS in one call
+        with smtp_phase("connect"):
+            await client.connect()
+        if self.password:
+            with smtp_phase("login"):
+                await client.login(self.username, self.password)
+
+    def send(self, msg):
+        asyncio.run_coroutine_threadsafe(self._send(msg), self._loop).result()
+
+    async def _close(self):
+        while not self._clients.empty():
+            client = self._clients.get_nowait()
+            if client.is_connected:
+                try:
+                    await client.quit()
+                except Exception:
+                    client.close()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class FileSpoolTransport(Transport):
+    """
+    Writes each message as a ``.eml`` file into a maildir-style directory.
+
+    Files are written under ``tmp/`` and renamed into ``new/``, so a reader
+    of ``new/`` never sees a partial message.
+    """
+
+    name = "file"
+
+    def __init__(self, directory):
+        self.directory = directory
+        for sub in ("tmp", "new", "cur"):
+            os.makedirs(os.path.join(directory, sub), exist_ok=True)
+        self._prefix = f"{os.getpid()}.{socket.gethostname().replace('/', '_')}"
+        self._counter = itertools.count()
+
+    def send(self, msg):
+        name = f"{time.time():.6f}.{self._prefix}.{next(self._counter)}.eml"
+        tmp_path = os.path.join(self.directory, "tmp", name)
+        with open(tmp_path, "wb") as f:
+            f.write(msg.raw)
+        os.replace(tmp_path, os.path.join(self.directory, "new", name))
+
+
+class MemoryTransport(Transport):
+    """
+    Keeps the most recent ``maxlen`` messages in memory, for tests and
+    benchmarks
+    """
+
+    name = "memory"
+
+    def __init__(self, maxlen=10000):
+        self.messages = deque(maxlen=maxlen)
+        self.sent = 0
+
+    def send(self, msg):
+        self.messages.append(msg)
+        self.sent += 1
+
+
+class NullTransport(Transport):
+    """
+    Discards every message
+    """
+
+    name = "null"
+
+    def send(self, msg):
+        pass
+
+
+class ConsoleTransport(Transport):
+    """
+    Logs messages to stdout instead of sending them (used when SMTP is not
+    configured). Each message is one write, so workers don't interleave.
+    """
+
+    name = "console"
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def send(self, msg):
+        rule = "=" * 60
+        block = (
+            f"\n{rule}\n"
+            f"To: {msg.recipient}\n"
+            f"Subject: {msg.subject}\n"
+            f"{rule}\n"
+            f"{msg.text.decode('utf-8')}"
+            f"{rule}\n\n"
+        )
+        with self._lock:
+            self.stream.write(block)
+            self.stream.flush()
+
+
+def create_transport(name=None):
+    """
+    Build the transport named by ``MAIL_TRANSPORT``: ``smtp``, ``async-smtp``,
+    ``file``, ``memory``, ``null`` or ``console``. Without a setting, SMTP is
+    used when ``SMTP_PASSWORD`` is set and the console otherwise.
+    """
+    name = name or os.getenv("MAIL_TRANSPORT") or ("smtp" if os.getenv("SMTP_PASSWORD") else "console")
+    if name == "smtp":
+        return SMTPTransport()
+    if name == "async-smtp":
+        return AsyncSMTPTransport(
+            host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            username=os.getenv("SMTP_EMAIL", "noreply@skillforge.ai"),
+            password=os.getenv("SMTP_PASSWORD", ""),
+            size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+            timeout=float(os.getenv("SMTP_TIMEOUT", "30")),
+            use_starttls=os.getenv("SMTP_STARTTLS", "1") != "0",
+        )
+    if name == "file":
+        return FileSpoolTransport(os.getenv("MAIL_SPOOL_DIR", "mail_spool"))
+    if name == "memory":
+        return MemoryTransport()
+    if name == "null":
+        return NullTransport()
+    if name == "console":
+        return ConsoleTransport()
+    raise ValueError(f"Unknown MAIL_TRANSPORT: {name}")
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """
+    Return the process-wide transport, creating it from the environment
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = create_transport()
+    return _transport
+
+
+def set_transport(transport):
+    """
+    Replace the process-wide transport (e.g. with a ``MemoryTransport``)
+    """
+    global _transport
+    with _transport_lock:
+        _transport = transport
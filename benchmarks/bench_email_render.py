@@ -0,0 +1,94 @@
+"""
+Microbenchmark: per-message render + serialize time of the precompiled
+email templates against the previous f-string + MIMEMultipart approach.
+
+    python benchmarks/bench_email_render.py [--number N]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import email_service  # noqa: E402
+from email_templates import MENTOR_NOTIFICATION_HTML, USER_CONFIRMATION_HTML, PASSWORD_RESET_HTML  # noqa: E402
+
+
+def _legacy(subject, to, html_source, **fields):
+    # What each send did before templates were precompiled: format the HTML,
+    # build a MIMEMultipart and let the email package serialize it
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = os.getenv("SMTP_EMAIL", "noreply@skillforge.ai")
+    msg["To"] = to
+    msg.attach(MIMEText(html_source.format(**fields), "html"))
+    return msg.as_bytes()
+
+
+def legacy_mentor_notification():
+    return _legacy(
+        "New Mentorship Connection Request from Ada Learner", "mentor@example.com",
+        MENTOR_NOTIFICATION_HTML, user_name="Ada Learner", user_email="ada@example.com",
+        message="Ada would like to connect with you for mentorship.",
+        date=datetime.now().strftime("%B %d, %Y at %I:%M %p"),
+    )
+
+
+def legacy_user_confirmation():
+    return _legacy(
+        "Connection Request Sent to Anna Mentor", "ada@example.com",
+        USER_CONFIRMATION_HTML, user_name="Ada Learner", mentor_name="Anna Mentor",
+    )
+
+
+def legacy_password_reset():
+    return _legacy(
+        "Password Reset - SkillForge Navigator", "ada@example.com",
+        PASSWORD_RESET_HTML, user_name="Ada Learner", temp_password="x7k2p9qa",
+    )
+
+
+def mentor_notification():
+    return email_service.build_mentor_notification(
+        "mentor@example.com", "Ada Learner", "ada@example.com",
+        "Ada would like to connect with you for mentorship.",
+    ).raw
+
+
+def user_confirmation():
+    return email_service.build_user_confirmation("ada@example.com", "Ada Learner", "Anna Mentor").raw
+
+
+def password_reset():
+    return email_service.build_password_reset_email("ada@example.com", "Ada Learner", "x7k2p9qa").raw
+
+
+CASES = [
+    ("mentor_notification", legacy_mentor_notification, mentor_notification),
+    ("user_confirmation", legacy_user_confirmation, user_confirmation),
+    ("password_reset", legacy_password_reset, password_reset),
+]
+
+
+def per_call_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing run")
+    args = parser.parse_args()
+
+    print(f"{'email':<22}{'legacy (us)':>14}{'compiled (us)':>16}{'speedup':>10}")
+    for name, legacy, compiled in CASES:
+        before = per_call_us(legacy, args.number)
+        after = per_call_us(compiled, args.number)
+        print(f"{name:<22}{before:>14.1f}{after:>16.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
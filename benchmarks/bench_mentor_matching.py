@@ -0,0 +1,84 @@
+"""
+Benchmark: vectorized top-k mentor matching on a synthetic catalogue, for
+one learner and for batches, against a pure Python score-and-sort loop.
+
+    python benchmarks/bench_mentor_matching.py [--mentors N] [--skills N] [--k N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from mentor_matching import MentorMatcher  # noqa: E402
+
+
+def synthetic_mentors(count, skills, rng):
+    return [
+        {
+            "mentor_name": f"Mentor {i}",
+            "expertise": rng.sample(skills, rng.randint(2, 8)),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "availability": rng.randint(10, 100),
+            "email": f"mentor{i}@example.com",
+        }
+        for i in range(count)
+    ]
+
+
+def python_top_k(mentors, learner, k):
+    # Score every mentor in a Python loop and sort the whole list
+    wanted = {skill.lower() for skill in learner}
+    scored = []
+    for mentor in mentors:
+        overlap = len(wanted.intersection(skill.lower() for skill in mentor["expertise"]))
+        if overlap:
+            score = 0.6 * overlap / len(wanted) + 0.25 * mentor["rating"] / 5 + 0.15 * mentor["availability"] / 100
+            scored.append((score, mentor["mentor_name"]))
+    scored.sort(reverse=True)
+    return scored[:k]
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mentors", type=int, default=100_000)
+    parser.add_argument("--skills", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    skills = [f"skill-{i}" for i in range(args.skills)]
+    mentors = synthetic_mentors(args.mentors, skills, rng)
+
+    started = time.perf_counter()
+    matcher = MentorMatcher(mentors)
+    print(f"{args.mentors} mentors x {len(matcher.skill_index)} skills, "
+          f"index built in {time.perf_counter() - started:.2f}s "
+          f"(padded incidence {matcher.mentor_skills.shape}, {matcher.mentor_skills.nbytes / 1e6:.1f} MB)")
+
+    learner = rng.sample(skills, 8)
+    loop = best_of(lambda: python_top_k(mentors, learner, args.k), args.repeat)
+    single = best_of(lambda: matcher.top_k([learner], args.k), args.repeat)
+    print(f"{'1 learner, python loop':<28}{loop * 1e3:>10.1f} ms")
+    print(f"{'1 learner, vectorized':<28}{single * 1e3:>10.1f} ms  ({loop / single:.0f}x)")
+
+    for batch in (10, 100, 1000):
+        learners = [rng.sample(skills, rng.randint(3, 12)) for _ in range(batch)]
+        elapsed = best_of(lambda: matcher.top_k(learners, args.k), args.repeat)
+        print(f"{f'{batch} learners, vectorized':<28}{elapsed * 1e3:>10.1f} ms  ({elapsed / batch * 1e3:.2f} ms per learner)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,604 @@
+"""
+Microbenchmark suite for the backend and frontend hot paths, with JSON
+baselines and a regression check. Runs without network access.
+
+    python benchmarks/suite.py run [--filter email.] [--save benchmarks/baseline.json]
+    python benchmarks/suite.py compare benchmarks/baseline.json [CURRENT.json] [--threshold 0.10]
+
+``compare`` runs the suite when no CURRENT file is given and exits with
+status 1 when any case is slower than the baseline by more than the
+threshold (a fraction: 0.10 is 10%).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.join(ROOT, "frontend"))
+
+# The notification server reads these at import: no real mail, a throwaway
+# outbox, and no sending policy delaying the mail queue
+os.environ.setdefault("MAIL_TRANSPORT", "null")
+os.environ.setdefault("OUTBOX_PATH", os.path.join(tempfile.mkdtemp(prefix="skillforge-bench-"), "outbox.db"))
+for _name in ("RATE_LIMIT_ACCOUNT_PER_MIN", "RATE_LIMIT_DOMAIN_PER_MIN", "DIGEST_WINDOW"):
+    os.environ.setdefault(_name, "0")
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+CASES = []
+
+
+def case(name):
+    """
+    Register ``factory`` as a benchmark. The factory does any setup and
+    returns ``run(number)``, which performs ``number`` operations and returns
+    the seconds they took.
+    """
+    def register(factory):
+        CASES.append((name, factory))
+        return factory
+    return register
+
+
+def timed(func):
+    # run(number) for a plain zero-argument callable
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+    return run
+
+
+# -- email_service --------------------------------------------------------
+
+def _email_cases():
+    import email_service
+    from email_templates import MENTOR_NOTIFICATION, USER_CONFIRMATION, PASSWORD_RESET, _encode_fields, current_date
+
+    emails = {
+        "mentor_notification": (
+            MENTOR_NOTIFICATION,
+            {"user_name": "Ada Learner", "user_email": "ada@example.com",
+             "message": "Ada would like to connect with you for mentorship.", "date": current_date()},
+            lambda: email_service.build_mentor_notification(
+                "mentor@example.com", "Ada Learner", "ada@example.com",
+                "Ada would like to connect with you for mentorship.",
+            ),
+        ),
+        "user_confirmation": (
+            USER_CONFIRMATION,
+            {"user_name": "Ada Learner", "mentor_name": "Anna Mentor"},
+            lambda: email_service.build_user_confirmation("ada@example.com", "Ada Learner", "Anna Mentor"),
+        ),
+        "password_reset": (
+            PASSWORD_RESET,
+            {"user_name": "Ada Learner", "temp_password": "x7k2p9qa"},
+            lambda: email_service.build_password_reset_email("ada@example.com", "Ada Learner", "x7k2p9qa"),
+        ),
+    }
+    for kind, (template, fields, build) in emails.items():
+        # HTML body alone: escaping the fields and splicing them in
+        case(f"email.html.{kind}")(
+            lambda template=template, fields=fields: timed(
+                lambda: template.html.render(_encode_fields(fields)[0])
+            )
+        )
+        # The whole serialized multipart message, as the send path builds it
+        case(f"email.mime.{kind}")(lambda build=build: timed(build))
+
+
+_email_cases()
+
+
+# -- request models -------------------------------------------------------
+
+CONNECTION_BODY = {
+    "user_name": "Ada Learner",
+    "user_email": "ada@example.com",
+    "mentor_name": "Anna Mentor",
+    "mentor_email": "mentor@example.com",
+    "message": "Ada would like to connect with you for mentorship.",
+}
+PASSWORD_RESET_BODY = {"email": "ada@example.com", "name": "Ada Learner", "temp_password": "x7k2p9qa"}
+
+
+@case("models.ConnectionRequest.json")
+def _():
+    from notification_server import ConnectionRequest
+    raw = json.dumps(CONNECTION_BODY).encode()
+    return timed(lambda: ConnectionRequest.model_validate_json(raw))
+
+
+@case("models.ConnectionRequest.dict")
+def _():
+    from notification_server import ConnectionRequest
+    return timed(lambda: ConnectionRequest.model_validate(CONNECTION_BODY))
+
+
+@case("models.PasswordResetRequest.json")
+def _():
+    from notification_server import PasswordResetRequest
+    raw = json.dumps(PASSWORD_RESET_BODY).encode()
+    return timed(lambda: PasswordResetRequest.model_validate_json(raw))
+
+
+@case("models.PasswordResetRequest.dict")
+def _():
+    from notification_server import PasswordResetRequest
+    return timed(lambda: PasswordResetRequest.model_validate(PASSWORD_RESET_BODY))
+
+
+# -- notification_server routes over ASGI ---------------------------------
+
+class ASGIHarness:
+    """
+    The notification server app, started once (lifespan included) on a
+    private event loop and called in-process through httpx
+    """
+
+    _instance = None
+
+    def __init__(self):
+        import httpx
+        import notification_server
+
+        self.app = notification_server.app
+        self.loop = asyncio.new_event_loop()
+        self._lifespan = self.app.router.lifespan_context(self.app)
+        self.loop.run_until_complete(self._lifespan.__aenter__())
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self.app), base_url="http://bench"
+        )
+        self.seen_routes = set()
+
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            cls._instance = ASGIHarness()
+        return cls._instance
+
+    def route(self, method, path, expect, make_request, template=None):
+        """
+        run(number) sending ``number`` requests one after another.
+        ``make_request(i)`` returns the keyword arguments for request ``i``.
+        ``template`` names the route when ``path`` fills in its parameters.
+        """
+        self.seen_routes.add((method, template or path.split("?", 1)[0]))
+        counter = iter(range(10 ** 12))
+
+        async def send(number):
+            start = time.perf_counter()
+            for _ in range(number):
+                resp = await self.client.request(method, path, **make_request(next(counter)))
+                if resp.status_code != expect:
+                    raise RuntimeError(f"{method} {path} returned {resp.status_code}: {resp.text[:200]}")
+            return time.perf_counter() - start
+
+        return lambda number: self.loop.run_until_complete(send(number))
+
+    def missing_routes(self):
+        from fastapi.routing import APIRoute
+        routes = {
+            (method, route.path)
+            for route in self.app.routes if isinstance(route, APIRoute)
+            for method in route.methods
+        }
+        return sorted(routes - self.seen_routes)
+
+    def close(self):
+        self.loop.run_until_complete(self.client.aclose())
+        self.loop.run_until_complete(self._lifespan.__aexit__(None, None, None))
+        self.loop.close()
+
+
+def _connection(i):
+    # Unique per request, so each one is a fresh send and not an idempotent replay
+    return dict(CONNECTION_BODY, message=f"Bench connection request {i}")
+
+
+@case("asgi.POST./send-connection-notification")
+def _():
+    return ASGIHarness.get().route(
+        "POST", "/send-connection-notification", 202, lambda i: {"json": _connection(i)}
+    )
+
+
+@case("asgi.POST./send-connection-notification.replay")
+def _():
+    return ASGIHarness.get().route(
+        "POST", "/send-connection-notification", 202,
+        lambda i: {"json": CONNECTION_BODY, "headers": {"Idempotency-Key": "bench-replay"}},
+    )
+
+
+@case("asgi.POST./send-connection-notifications/batch")
+def _():
+    return ASGIHarness.get().route(
+        "POST", "/send-connection-notifications/batch", 202,
+        lambda i: {"json": [_connection(i * 10 + j) for j in range(10)]},
+    )
+
+
+@case("asgi.POST./send-password-reset")
+def _():
+    return ASGIHarness.get().route(
+        "POST", "/send-password-reset", 202,
+        lambda i: {"json": dict(PASSWORD_RESET_BODY, temp_password=f"tmp-{i:08d}")},
+    )
+
+
+def _delivered_notifications(harness, count):
+    # Notification ids whose emails have all been delivered, so an event
+    # stream on one sends its statuses and ``done`` and closes
+    async def send():
+        ids = []
+        for i in range(count):
+            resp = await harness.client.post(
+                "/send-password-reset", json=dict(PASSWORD_RESET_BODY, temp_password=f"evt-{i:08d}")
+            )
+            ids.append(resp.json()["notification_id"])
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            resp = await harness.client.post("/notifications/status", json={"ids": ids})
+            if all(n["status"] == "delivered" for n in resp.json()["notifications"].values()):
+                return ids
+            await asyncio.sleep(0.01)
+        raise RuntimeError("Bench notifications were not delivered in time")
+
+    return harness.loop.run_until_complete(send())
+
+
+@case("asgi.GET./notifications/{notification_id}/events")
+def _():
+    harness = ASGIHarness.get()
+    notification_id = _delivered_notifications(harness, 1)[0]
+    return harness.route(
+        "GET", f"/notifications/{notification_id}/events", 200, lambda i: {},
+        template="/notifications/{notification_id}/events",
+    )
+
+
+@case("asgi.POST./notifications/status")
+def _():
+    harness = ASGIHarness.get()
+    # Tracked ids plus a few this process never saw, which fall back to the outbox
+    ids = _delivered_notifications(harness, 20) + [f"{i:032x}" for i in range(5)]
+    return harness.route("POST", "/notifications/status", 200, lambda i: {"json": {"ids": ids}})
+
+
+@case("asgi.GET./idempotency/stats")
+def _():
+    return ASGIHarness.get().route("GET", "/idempotency/stats", 200, lambda i: {})
+
+
+@case("asgi.GET./get-mentors")
+def _():
+    return ASGIHarness.get().route("GET", "/get-mentors", 200, lambda i: {})
+
+
+@case("asgi.GET./get-mentors.filtered")
+def _():
+    return ASGIHarness.get().route(
+        "GET", "/get-mentors", 200,
+        lambda i: {"params": {"expertise": "Python,SQL", "min_rating": 4.5, "limit": 2}},
+    )
+
+
+@case("asgi.GET./get-mentors.not-modified")
+def _():
+    harness = ASGIHarness.get()
+    etag = harness.loop.run_until_complete(harness.client.get("/get-mentors")).headers["ETag"]
+    return harness.route("GET", "/get-mentors", 304, lambda i: {"headers": {"If-None-Match": etag}})
+
+
+@case("asgi.POST./match-mentors")
+def _():
+    return ASGIHarness.get().route(
+        "POST", "/match-mentors", 200, lambda i: {"json": {"skills": ["Python", "SQL"], "k": 3}}
+    )
+
+
+@case("asgi.POST./match-mentors/batch")
+def _():
+    learners = [["Python", "SQL"], ["JavaScript"], ["AWS", "DevOps", "Python"], ["TensorFlow"]] * 25
+    return ASGIHarness.get().route(
+        "POST", "/match-mentors/batch", 200, lambda i: {"json": {"learners": learners, "k": 3}}
+    )
+
+
+@case("asgi.GET./health")
+def _():
+    return ASGIHarness.get().route("GET", "/health", 200, lambda i: {})
+
+
+@case("asgi.GET./metrics")
+def _():
+    return ASGIHarness.get().route("GET", "/metrics", 200, lambda i: {})
+
+
+# -- state shared by worker processes -------------------------------------
+
+def _shared_state_cases():
+    # What NOTIFICATION_WORKERS > 1 adds per request, against the
+    # in-process equivalents
+    from idempotency import IdempotencyCache, SharedIdempotencyCache
+    from metrics import REGISTRY
+    from rate_limit import BucketTable, DeliveryScheduler, SharedBucketTable
+    from shared_state import SharedStore
+
+    store = SharedStore(os.path.join(tempfile.mkdtemp(prefix="skillforge-bench-"), "shared_state.db"))
+
+    def claims(make_cache):
+        cache = make_cache()
+        loop = asyncio.new_event_loop()
+        counter = iter(range(10 ** 12))
+
+        async def claim(number):
+            start = time.perf_counter()
+            for _ in range(number):
+                outcome = loop.create_future()
+                await cache.claim(f"key:{next(counter)}", "fingerprint", outcome)
+                outcome.set_result((202, {"success": True}))
+                await asyncio.sleep(0)  # lets the shared cache hand off the response
+            return time.perf_counter() - start
+
+        return lambda number: loop.run_until_complete(claim(number))
+
+    def schedules(buckets):
+        scheduler = DeliveryScheduler(maxsize=10 ** 9, account_rate=1e9, account_burst=10 ** 9,
+                                      domain_rate=1e9, domain_burst=10 ** 9, buckets=buckets)
+
+        def send():
+            scheduler.put("job", account="sender@example.com", recipients=("ada@example.com",))
+            scheduler.get()
+        return timed(send)
+
+    case("idempotency.claim.local")(lambda: claims(lambda: IdempotencyCache(maxsize=10 ** 9)))
+    case("idempotency.claim.shared")(lambda: claims(lambda: SharedIdempotencyCache(store, maxsize=10 ** 9)))
+    case("rate_limit.schedule.local")(lambda: schedules(BucketTable()))
+    case("rate_limit.schedule.shared")(lambda: schedules(SharedBucketTable(store)))
+
+    @case("metrics.expose.merged.4")
+    def _():
+        # A /metrics scrape summing four workers' totals
+        snapshot = json.loads(json.dumps(REGISTRY.snapshot()))
+        return timed(lambda: REGISTRY.expose([(snapshot, True)] * 4))
+
+
+_shared_state_cases()
+
+
+# -- frontend ------------------------------------------------------------
+
+def _walker_body(report):
+    return json.dumps({"status": 200, "reports": [report]}).encode()
+
+
+def _skills(count):
+    rng = random.Random(7)
+    return [
+        {"name": f"Skill {i}", "category": rng.choice(["AI/ML", "Data", "Web"]),
+         "difficulty": rng.randint(1, 10), "market_demand": round(rng.random(), 2), "version": 1}
+        for i in range(count)
+    ]
+
+
+def _unwrap_cases():
+    from walker_client import unwrap_reports
+
+    bodies = {
+        "readiness": _walker_body(0.6666666666666666),
+        "learning_path": _walker_body(["Python Foundations", "Intro to ML with TensorFlow"]),
+        "skill_graph": _walker_body(_skills(7)),
+        "skill_graph_page": _walker_body({"skills": _skills(500), "next_cursor": 500, "version": 1}),
+    }
+    for shape, body in bodies.items():
+        # What WalkerClient.call does with a response: decode, then unwrap
+        case(f"frontend.walker_client.unwrap.{shape}")(
+            lambda body=body: timed(lambda: unwrap_reports(json.loads(body)))
+        )
+
+
+_unwrap_cases()
+
+
+def _mentor_match_cases():
+    # Mentor ranking, done by the matching engine since it left page_mentor_match
+    from mentor_catalog import create_mentor_catalog
+    from mentor_matching import MentorMatcher
+
+    skills = ["Python", "SQL", "JavaScript", "TensorFlow", "AWS", "DevOps", "React", "Go", "Rust", "Docker"]
+
+    def synthetic(count):
+        rng = random.Random(11)
+        return [
+            {"mentor_name": f"Mentor {i}", "expertise": rng.sample(skills, rng.randint(1, 4)),
+             "rating": round(rng.uniform(3.0, 5.0), 1), "availability": rng.randint(10, 100)}
+            for i in range(count)
+        ]
+
+    catalogs = {
+        "catalog": lambda: create_mentor_catalog().mentors,
+        "10k": lambda: synthetic(10_000),
+    }
+    for size, mentors in catalogs.items():
+        def factory(mentors=mentors):
+            matcher = MentorMatcher(mentors())
+            return timed(lambda: matcher.match([["Python", "SQL"]], 5))
+        case(f"frontend.mentor_match.{size}")(factory)
+
+
+_mentor_match_cases()
+
+
+# -- running and comparing ------------------------------------------------
+
+def measure(run, min_time, repeat):
+    """
+    Calibrate ``number`` so one timing takes at least ``min_time`` seconds,
+    then time ``repeat`` runs. Returns per-operation microseconds.
+    """
+    run(1)  # warm up
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+    samples = [elapsed] + [run(number) for _ in range(repeat - 1)]
+    per_op = [sample / number * 1e6 for sample in samples]
+    return {
+        "min_us": min(per_op),
+        "median_us": statistics.median(per_op),
+        "stdev_us": statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(pattern=None, min_time=0.2, repeat=5):
+    selected = [(name, factory) for name, factory in CASES if not pattern or pattern in name]
+    results = {}
+    print(f"{'benchmark':<52}{'min (us)':>12}{'median (us)':>14}{'runs':>10}")
+    try:
+        for name, factory in selected:
+            result = measure(factory(), min_time, repeat)
+            results[name] = result
+            print(f"{name:<52}{result['min_us']:>12.2f}{result['median_us']:>14.2f}"
+                  f"{result['number']:>7}x{result['repeat']}", flush=True)
+    finally:
+        if ASGIHarness._instance is not None:
+            if not pattern:
+                missing = ASGIHarness._instance.missing_routes()
+                if missing:
+                    print("Routes without a benchmark: " + ", ".join(f"{m} {p}" for m, p in missing))
+            ASGIHarness._instance.close()
+            ASGIHarness._instance = None
+    return {"environment": environment(), "results": results}
+
+
+def compare(baseline, current, threshold, stat="min_us"):
+    """
+    Print the change of every case present in both runs and return the names
+    of those slower by more than ``threshold``
+    """
+    regressions = []
+    old_results, new_results = baseline["results"], current["results"]
+    print(f"{'benchmark':<52}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name in sorted(set(old_results) | set(new_results)):
+        if name not in new_results:
+            print(f"{name:<52}{old_results[name][stat]:>12.2f}{'-':>12}{'removed':>10}")
+            continue
+        if name not in old_results:
+            print(f"{name:<52}{'-':>12}{new_results[name][stat]:>12.2f}{'new':>10}")
+            continue
+        before, after = old_results[name][stat], new_results[name][stat]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<52}{before:>12.2f}{after:>12.2f}{change * 100:>+9.1f}%{flag}")
+
+    old_env, new_env = baseline.get("environment", {}), current.get("environment", {})
+    for key in ("python", "machine", "cpu_count"):
+        if old_env.get(key) != new_env.get(key):
+            print(f"Note: {key} differs ({old_env.get(key)} vs {new_env.get(key)}); results may not be comparable")
+    return regressions
+
+
+def save(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Saved {len(data['results'])} results to {path}")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    timing = argparse.ArgumentParser(add_help=False)
+    timing.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    timing.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run")
+    timing.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark")
+
+    run_parser = commands.add_parser("run", parents=[timing], help="run the suite")
+    run_parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+
+    compare_parser = commands.add_parser("compare", parents=[timing], help="check for regressions against a baseline")
+    compare_parser.add_argument("baseline", nargs="?", default=DEFAULT_BASELINE)
+    compare_parser.add_argument("current", nargs="?", help="results to check (default: run the suite now)")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="slowdown that counts as a regression, as a fraction")
+    compare_parser.add_argument("--stat", choices=["min_us", "median_us"], default="min_us")
+    compare_parser.add_argument("--save", metavar="PATH", help="also write the new results")
+
+    args = parser.parse_args(argv)
+    selected = [name for name, _ in CASES if not args.filter or args.filter in name]
+    if not selected:
+        parser.error(f"no benchmark matches {args.filter!r}")
+
+    if args.command == "run":
+        results = run_suite(args.filter, args.min_time, args.repeat)
+        if args.save:
+            save(results, args.save)
+        return 0
+
+    baseline = load(args.baseline)
+    if args.filter:
+        baseline["results"] = {
+            name: result for name, result in baseline["results"].items() if args.filter in name
+        }
+    if args.current:
+        current = load(args.current)
+    else:
+        current = run_suite(args.filter, args.min_time, args.repeat)
+        if args.save:
+            save(current, args.save)
+        print()
+    regressions = compare(baseline, current, args.threshold, args.stat)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold * 100:g}%: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold * 100:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
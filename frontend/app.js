@@ -1252,6 +1252,13 @@ async function connectWithMentor(mentorName, mentorIndex) {
             localStorage.setItem('currentUser', JSON.stringify(currentUser));
             
             showNotification(`✓ Connection request sent to ${mentorName}!`, 'success');
+
+            if (notificationResponse.ok) {
+                const notification = await notificationResponse.json();
+                if (notification.events_url) {
+                    watchDelivery(notification.events_url, mentorName);
+                }
+            }
         } else {
             showNotification(`Failed to send connection request`, 'error');
         }
@@ -1272,6 +1279,24 @@ async function connectWithMentor(mentorName, mentorIndex) {
     }
 }
 
+// Follow email delivery for a connection request
+function watchDelivery(eventsUrl, mentorName) {
+    const events = new EventSource('http://localhost:8001' + eventsUrl);
+
+    events.addEventListener('done', (event) => {
+        const result = JSON.parse(event.data);
+        if (result.status === 'delivered') {
+            showNotification(`✓ ${mentorName} has been emailed`, 'success');
+        } else {
+            showNotification(`Email to ${mentorName} could not be delivered`, 'error');
+        }
+        events.close();
+    });
+
+    // The stream is a convenience; stop quietly if it drops
+    events.onerror = () => events.close();
+}
+
 // Update Connected Mentor Buttons
 function updateConnectedMentorButtons() {
     const connectedMentors = JSON.parse(localStorage.getItem('connectedMentors') || '[]');
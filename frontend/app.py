@@ -1,8 +1,17 @@
 import os
+from concurrent.futures import as_completed
+
 import requests
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from challenge_pool import CHALLENGE_LEVELS, CHALLENGE_SKILLS, get_challenge_pool
+from evaluation_cache import get_evaluation_cache
+from skill_graph_store import get_skill_graph_store
+from walker_cache import get_walker_cache
+from walker_client import get_walker_client, get_walker_executor
 
-JAC_SERVER_URL = os.getenv("JAC_SERVER_URL", "http://localhost:8000")
+NOTIFICATION_SERVER_URL = os.getenv("NOTIFICATION_SERVER_URL", "http://localhost:8001")
 
 
 def init_page():
@@ -70,22 +79,43 @@ def init_page():
     )
 
 
-def call_walker(path: str, payload: dict | None = None):
-    url = f"{JAC_SERVER_URL}/walker/{path}"
+def session_id() -> str | None:
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def fetch_walker(path: str, payload: dict | None = None, session: str | None = None):
+    # Returns (result, error) and never touches st, so it can run on a
+    # worker thread. Cached walkers skip the backend while their result is
+    # fresh.
+    cache = get_walker_cache()
+    key = cache.key(path, payload, session)
+    if key is not None:
+        found, value = cache.get(key)
+        if found:
+            return value, None
     try:
-        resp = requests.post(url, json=payload or {})
-        resp.raise_for_status()
-        data = resp.json()
-        # Jac Cloud wraps walker output as {"status": ..., "reports": [...]}.
-        if isinstance(data, dict) and "reports" in data:
-            reports = data.get("reports") or []
-            if reports:
-                return reports[0]
-            return None
-        return data
+        result = get_walker_client().call(path, payload)
     except Exception as e:
-        st.error(f"Error calling {path}: {e}")
-        return None
+        return None, e
+    cache.after_call(path)
+    if key is not None:
+        cache.put(key, result)
+    return result, None
+
+
+def call_walkers_parallel(calls: dict[str, tuple[str, dict | None]]):
+    # Runs independent walker calls concurrently and yields
+    # (name, result, error) as each one finishes
+    session = session_id()
+    executor = get_walker_executor()
+    futures = {
+        executor.submit(fetch_walker, path, payload, session): name
+        for name, (path, payload) in calls.items()
+    }
+    for future in as_completed(futures):
+        result, error = future.result()
+        yield futures[future], result, error
 
 
 def page_dashboard():
@@ -118,32 +148,18 @@ def page_dashboard():
     else:
         target_career = choice
 
-    # Automatically compute readiness and learning path for the selected career
-    score = call_walker(
-        "career_readiness_agent", {"target_career_title": target_career}
-    )
-    path = call_walker(
-        "learning_path_agent", {"target_career_title": target_career}
-    )
-
     col1, col2 = st.columns(2)
 
+    # Placeholders keep each column's spot; they are filled as results arrive
     with col1:
         st.subheader("Career readiness")
-        if isinstance(score, (int, float)):
-            pct = max(0.0, min(1.0, float(score)))
-            st.metric(f"Readiness for {target_career}", f"{pct * 100:.1f}%")
-            st.progress(pct)
-        else:
-            st.write("Readiness score not available yet.")
+        readiness_slot = st.empty()
+        readiness_slot.caption("Computing readiness...")
 
     with col2:
         st.subheader("Recommended learning path")
-        if isinstance(path, list) and path:
-            for i, step in enumerate(path, start=1):
-                st.write(f"{i}. {step}")
-        else:
-            st.write("No learning path available yet for this career.")
+        path_slot = st.empty()
+        path_slot.caption("Building learning path...")
 
     st.markdown("### How SkillForge helps you")
     c1, c2, c3 = st.columns(3)
@@ -220,23 +236,64 @@ def page_dashboard():
             unsafe_allow_html=True,
         )
 
+    # Automatically compute readiness and learning path for the selected
+    # career, both at once, after the static sections have been drawn
+    results = call_walkers_parallel({
+        "readiness": ("career_readiness_agent", {"target_career_title": target_career}),
+        "path": ("learning_path_agent", {"target_career_title": target_career}),
+    })
+    for name, result, error in results:
+        if name == "readiness":
+            with readiness_slot.container():
+                if error is not None:
+                    st.error(f"Error calling career_readiness_agent: {error}")
+                render_readiness(target_career, result)
+        else:
+            with path_slot.container():
+                if error is not None:
+                    st.error(f"Error calling learning_path_agent: {error}")
+                render_learning_path(result)
+
+
+def render_readiness(target_career: str, score):
+    if isinstance(score, (int, float)):
+        pct = max(0.0, min(1.0, float(score)))
+        st.metric(f"Readiness for {target_career}", f"{pct * 100:.1f}%")
+        st.progress(pct)
+    else:
+        st.write("Readiness score not available yet.")
+
+
+def render_learning_path(path):
+    if isinstance(path, list) and path:
+        for i, step in enumerate(path, start=1):
+            st.write(f"{i}. {step}")
+    else:
+        st.write("No learning path available yet for this career.")
+
 
 def page_skill_graph():
     st.title("Skill Graph Snapshot")
 
+    store = get_skill_graph_store()
     if st.button("Refresh skills"):
-        skills = call_walker("get_skill_graph", {})
-        if isinstance(skills, list) and skills:
+        # Full paged load the first time, then only what changed
+        try:
+            changed = store.refresh()
+        except Exception as e:
+            st.error(f"Error calling get_skill_graph: {e}")
+        else:
+            st.caption(f"{changed} skills updated")
+
+    if store.loaded:
+        skills = store.frame()
+        if len(skills):
             st.subheader("Skills in your graph")
-            st.dataframe(skills)
+            st.dataframe(skills, hide_index=True)
             # Optional simple visualization of market demand
-            try:
-                demand = {s["name"]: s.get("market_demand", 0) for s in skills if "name" in s}
-                if demand:
-                    st.subheader("Market demand")
-                    st.bar_chart(demand)
-            except Exception:
-                pass
+            if "market_demand" in skills:
+                st.subheader("Market demand")
+                st.bar_chart(skills, x="name", y="market_demand")
         else:
             st.write("No skills available.")
 
@@ -244,91 +301,136 @@ def page_skill_graph():
 def page_coding_challenge():
     st.title("Adaptive Coding Challenge")
 
-    skill_options = [
-        "Python",
-        "JavaScript",
-        "TypeScript",
-        "Go",
-        "Rust",
-        "SQL",
-        "TensorFlow",
-        "Custom",
-    ]
+    # Starts pre-generating challenges for the listed skills and levels
+    pool = get_challenge_pool()
+
+    skill_options = CHALLENGE_SKILLS + ["Custom"]
     choice = st.selectbox("Skill / Language", skill_options, index=0)
     if choice == "Custom":
         skill = st.text_input("Custom skill or language", value="Python")
     else:
         skill = choice
 
-    level = st.selectbox("Level", ["beginner", "intermediate", "advanced"], index=0)
+    level = st.selectbox("Level", CHALLENGE_LEVELS, index=0)
 
     if st.button("Generate challenge"):
-        challenge = call_walker("content_curator_agent", {"skill_name": skill, "level": level})
+        # Served from the pool when one is ready; live generation otherwise,
+        # shown token by token when the server streams it
+        challenge = pool.take(skill, level)
+        st.subheader("Challenge")
+        if challenge is None:
+            challenge, streamed = stream_walker(
+                "content_curator_agent", {"skill_name": skill, "level": level}
+            )
+            if streamed:
+                challenge = None
         if challenge is not None:
-            st.subheader("Challenge")
-            if isinstance(challenge, dict):
-                prompt = (
-                    challenge.get("prompt")
-                    or challenge.get("description")
-                    or challenge.get("text")
-                )
-                if isinstance(prompt, str):
-                    st.write(prompt)
-                else:
-                    st.json(challenge)
-            elif isinstance(challenge, str):
-                st.write(challenge)
-            else:
-                st.json(challenge)
+            render_challenge(challenge)
 
     code = st.text_area("Your solution code", height=200)
 
     if st.button("Evaluate submission") and code.strip():
-        result = call_walker(
-            "evaluation_agent",
-            {"code": code, "skill_name": skill, "level": level},
-        )
+        # Identical code (ignoring comments and formatting) reuses its feedback
+        evaluations = get_evaluation_cache()
+        result = evaluations.get(code, skill, level)
+        st.subheader("AI Feedback")
+        if result is None:
+            result, streamed = stream_walker(
+                "evaluation_agent",
+                {"code": code, "skill_name": skill, "level": level},
+            )
+            if result is not None:
+                evaluations.put(code, skill, level, result)
+            if streamed:
+                result = None
+        else:
+            st.caption(f"Cached feedback (hit rate {evaluations.hit_rate * 100:.0f}%)")
         if result is not None:
-            st.subheader("AI Feedback")
-            if isinstance(result, dict):
-                feedback = result.get("feedback") or result.get("summary")
-                if isinstance(feedback, str):
-                    st.write(feedback)
-                else:
-                    st.json(result)
-            elif isinstance(result, str):
-                st.write(result)
-            else:
-                st.json(result)
+            render_feedback(result)
+
+
+def stream_walker(path: str, payload: dict | None = None):
+    # Returns (result, streamed). Streamed output is written as it arrives
+    # and its full text returned; a server that doesn't stream gets the
+    # buffered result back for the caller to render.
+    try:
+        stream = get_walker_client().stream(path, payload)
+        if not stream.streaming:
+            return stream.result(), False
+        return st.write_stream(stream.chunks()), True
+    except Exception as e:
+        st.error(f"Error calling {path}: {e}")
+        return None, False
+
+
+def render_challenge(challenge):
+    if isinstance(challenge, dict):
+        prompt = (
+            challenge.get("prompt")
+            or challenge.get("description")
+            or challenge.get("text")
+        )
+        if isinstance(prompt, str):
+            st.write(prompt)
+        else:
+            st.json(challenge)
+    elif isinstance(challenge, str):
+        st.write(challenge)
+    else:
+        st.json(challenge)
+
+
+def render_feedback(result):
+    if isinstance(result, dict):
+        feedback = result.get("feedback") or result.get("summary")
+        if isinstance(feedback, str):
+            st.write(feedback)
+        else:
+            st.json(result)
+    elif isinstance(result, str):
+        st.write(result)
+    else:
+        st.json(result)
+
+
+def match_mentors(skills: list[str], k: int = 10):
+    # Ranked server-side by the notification server's matching engine
+    try:
+        resp = requests.post(
+            f"{NOTIFICATION_SERVER_URL}/match-mentors",
+            json={"skills": skills, "k": k},
+            timeout=10,
+        )
+        resp.raise_for_status()
+        return resp.json()
+    except Exception as e:
+        st.error(f"Error matching mentors: {e}")
+        return None
 
 
 def page_mentor_match():
     st.title("Mentor Matching")
 
+    skills_text = st.text_input("Your skills (comma-separated)", value="Python, SQL")
+    k = st.slider("Mentors to show", min_value=1, max_value=20, value=5)
+
     if st.button("Find mentors"):
-        matches = call_walker("mentor_match_agent", {})
+        skills = [s.strip() for s in skills_text.split(",") if s.strip()]
+        matches = match_mentors(skills, k)
         if matches is not None:
             st.subheader("Recommended Mentors")
             if isinstance(matches, list) and matches:
-                # Sort by score descending
-                try:
-                    matches_sorted = sorted(
-                        matches,
-                        key=lambda m: m.get("score", 0),
-                        reverse=True,
-                    )
-                except Exception:
-                    matches_sorted = matches
-
-                best = matches_sorted[0]
+                # Already ranked by score, best first
+                best = matches[0]
                 st.markdown(
                     f"**Top match:** {best.get('mentor_name', 'Unknown')} "
-                    f"(score {best.get('score', 0):.2f})"
+                    f"(score {best.get('score', 0):.2f}, "
+                    f"{best.get('overlap', 0)} shared skills)"
                 )
                 st.write("Full list:")
-                st.dataframe(matches_sorted)
+                st.dataframe(matches)
             else:
-                st.write("No mentors found yet.")
+                st.write("No mentors share these skills yet.")
 
 
 def main():
@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from collections import deque
+
+from walker_client import get_walker_client
+
+# Skills and levels offered on the coding challenge page
+CHALLENGE_SKILLS = ["Python", "JavaScript", "TypeScript", "Go", "Rust", "SQL", "TensorFlow"]
+CHALLENGE_LEVELS = ["beginner", "intermediate", "advanced"]
+
+
+class ChallengePool:
+    """
+    Challenges generated ahead of time by background workers, keyed by
+    ``(skill, level)``.
+
+    Each key is topped up to ``target_depth`` ready challenges and refilled
+    once a take leaves it below ``low_water``; the pool never holds more than
+    ``max_total`` challenges in all. A key whose generation fails is left
+    alone for ``retry_after`` seconds, then generated again.
+    """
+
+    def __init__(self, fetch, keys, target_depth: int = 2, low_water: int = 1,
+                 max_total: int = 60, workers: int = 2, retry_after: float = 30.0):
+        self.fetch = fetch
+        self.keys = list(keys)
+        self.target_depth = target_depth
+        self.low_water = low_water
+        self.max_total = max_total
+        self.workers = workers
+        self.retry_after = retry_after
+        self.hits = 0
+        self.misses = 0
+
+        self._ready = {key: deque() for key in self.keys}
+        self._generating = {key: 0 for key in self.keys}
+        self._failed_at = {}
+        self._refills = deque()  # keys waiting for a worker, each queued once
+        self._queued = set()
+        self._total = 0
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            for key in self.keys:
+                self._schedule(key)
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"challenge-pool-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def take(self, skill: str, level: str):
+        """
+        Return a ready challenge for ``(skill, level)``, or None on a miss
+        """
+        key = (skill, level)
+        with self._cond:
+            ready = self._ready.get(key)
+            if not ready:
+                self.misses += 1
+                if ready is not None:
+                    self._schedule(key)
+                return None
+            challenge = ready.popleft()
+            self._total -= 1
+            self.hits += 1
+            if len(ready) < self.low_water:
+                self._schedule(key)
+            return challenge
+
+    def depth(self, skill: str, level: str) -> int:
+        with self._cond:
+            return len(self._ready.get((skill, level), ()))
+
+    def _wanted(self, key) -> bool:
+        # Another challenge for key fits both its target and the total bound
+        if self._failed_at.get(key, -self.retry_after) + self.retry_after > time.monotonic():
+            return False
+        generating = sum(self._generating.values())
+        return (len(self._ready[key]) + self._generating[key] < self.target_depth
+                and self._total + generating < self.max_total)
+
+    def _schedule(self, key):
+        if key not in self._queued and self._wanted(key):
+            self._queued.add(key)
+            self._refills.append(key)
+            self._cond.notify()
+
+    def _retry_failed(self) -> float | None:
+        # Requeues keys whose retry_after has passed since they failed and
+        # returns the seconds until the next one is due (None when none is)
+        now = time.monotonic()
+        next_due = None
+        for key, failed_at in list(self._failed_at.items()):
+            due = failed_at + self.retry_after - now
+            if due <= 0:
+                del self._failed_at[key]
+                self._schedule(key)
+            elif next_due is None or due < next_due:
+                next_due = due
+        return next_due
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # Failed keys are retried even if nobody asks for them, so a
+                # pool started while the Jac server was down still fills up
+                while not self._refills:
+                    timeout = self._retry_failed()
+                    if not self._refills:
+                        self._cond.wait(timeout)
+                key = self._refills.popleft()
+                self._queued.discard(key)
+                if not self._wanted(key):
+                    continue
+                self._generating[key] += 1
+
+            try:
+                challenge = self.fetch(*key)
+            except Exception as e:
+                challenge = None
+                print(f"Error pre-generating {key[0]} {key[1]} challenge: {e}")
+
+            with self._cond:
+                self._generating[key] -= 1
+                if challenge is None:
+                    self._failed_at[key] = time.monotonic()
+                    continue
+                self._failed_at.pop(key, None)
+                self._ready[key].append(challenge)
+                self._total += 1
+                # One challenge per turn, so every key fills up in parallel
+                self._schedule(key)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "ready": self._total,
+                "generating": sum(self._generating.values()),
+            }
+
+
+def generate_challenge(skill: str, level: str):
+    return get_walker_client().call("content_curator_agent", {"skill_name": skill, "level": level})
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_challenge_pool() -> ChallengePool:
+    """
+    Return the process-wide challenge pool, started on first use
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ChallengePool(
+                    generate_challenge,
+                    [(skill, level) for skill in CHALLENGE_SKILLS for level in CHALLENGE_LEVELS],
+                    target_depth=int(os.getenv("CHALLENGE_POOL_DEPTH", "2")),
+                    low_water=int(os.getenv("CHALLENGE_POOL_LOW_WATER", "1")),
+                    max_total=int(os.getenv("CHALLENGE_POOL_MAX", "60")),
+                    workers=int(os.getenv("CHALLENGE_POOL_WORKERS", "2")),
+                )
+                pool.start()
+                _pool = pool
+    return _pool
@@ -0,0 +1,194 @@
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import tokenize
+from collections import OrderedDict
+
+# Line comment markers per language; block comments are /* ... */ for all
+# but Python and SQL also accepts them
+LINE_COMMENTS = {
+    "python": ("#",),
+    "sql": ("--",),
+}
+DEFAULT_LINE_COMMENTS = ("//",)
+
+_WHITESPACE = re.compile(r"\s+")
+# A space between punctuation and a word or literal carries no meaning
+# outside strings; one between two punctuation marks may (``a - -b`` is not
+# ``a--b``), so it stays
+_PUNCTUATION = r"[^\w\s\"'`]"
+_BY_PUNCTUATION = re.compile(rf"(?<={_PUNCTUATION}) (?!{_PUNCTUATION})|(?<!{_PUNCTUATION}) (?={_PUNCTUATION})")
+
+
+def _normalize_python(code: str) -> str:
+    # Token stream without comments or blank lines; indentation is kept as
+    # INDENT/DEDENT tokens, so only meaningful structure remains
+    parts = []
+    for token in tokenize.generate_tokens(io.StringIO(code).readline):
+        if token.type in (tokenize.COMMENT, tokenize.NL, tokenize.ENDMARKER):
+            continue
+        if token.type == tokenize.NEWLINE:
+            parts.append("\n")
+        elif token.type == tokenize.INDENT:
+            parts.append("<indent>")
+        elif token.type == tokenize.DEDENT:
+            parts.append("<dedent>")
+        else:
+            parts.append(token.string)
+    return " ".join(parts)
+
+
+def _normalize_generic(code: str, line_comments) -> str:
+    # Drops comments and collapses whitespace, leaving string literals as
+    # written (a comment marker inside a string is not a comment)
+    out = []
+    code_run = []
+    i, n = 0, len(code)
+
+    def flush():
+        text = _WHITESPACE.sub(" ", "".join(code_run))
+        out.append(_BY_PUNCTUATION.sub("", text))
+        code_run.clear()
+
+    while i < n:
+        ch = code[i]
+        if ch in "\"'`":
+            end = i + 1
+            while end < n and code[end] != ch:
+                end += 2 if code[end] == "\\" else 1
+            flush()
+            out.append(code[i:end + 1])
+            i = end + 1
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            code_run.append(" ")
+        elif any(code.startswith(marker, i) for marker in line_comments):
+            end = code.find("\n", i)
+            i = n if end < 0 else end
+        else:
+            code_run.append(ch)
+            i += 1
+    flush()
+    return "".join(out).strip()
+
+
+def normalize_code(code: str, skill_name: str) -> str:
+    """
+    Code with comments and insignificant whitespace removed, so trivially
+    different submissions compare equal
+    """
+    language = skill_name.strip().lower()
+    if language == "python":
+        try:
+            return _normalize_python(code)
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            pass
+    return _normalize_generic(code, LINE_COMMENTS.get(language, DEFAULT_LINE_COMMENTS))
+
+
+def evaluation_key(code: str, skill_name: str, level: str) -> str:
+    normalized = normalize_code(code, skill_name)
+    scope = f"{skill_name.strip().lower()}\0{level.strip().lower()}\0"
+    return hashlib.sha256((scope + normalized).encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """
+    Content-addressed cache of ``evaluation_agent`` results: an in-memory LRU
+    in front of an optional SQLite file shared by restarts and processes.
+    """
+
+    def __init__(self, maxsize: int = 1000, path: str | None = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, code: str, skill_name: str, level: str):
+        """
+        Return the cached result for this submission, or None
+        """
+        key = evaluation_key(code, skill_name, level)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return self._entries[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT result FROM evaluations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.disk_hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put(self, code: str, skill_name: str, level: str, result):
+        key = evaluation_key(code, skill_name, level)
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO evaluations (key, result, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(result), time.time()),
+                )
+                self._db.commit()
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self._entries),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_evaluation_cache() -> EvaluationCache:
+    """
+    Return the process-wide evaluation cache; ``EVALUATION_CACHE_PATH``
+    enables the on-disk tier
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EvaluationCache(
+                    maxsize=int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "1000")),
+                    path=os.getenv("EVALUATION_CACHE_PATH") or None,
+                )
+    return _cache
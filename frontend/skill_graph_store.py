@@ -0,0 +1,104 @@
+import os
+import threading
+
+import pandas as pd
+
+from walker_client import get_walker_client
+
+SKILL_GRAPH_PAGE_SIZE = int(os.getenv("SKILL_GRAPH_PAGE_SIZE", "500"))
+SKILL_COLUMNS = ["name", "category", "difficulty", "market_demand"]
+
+
+def fetch_skill_page(cursor: int, since: int):
+    return get_walker_client().call(
+        "get_skill_graph",
+        {"cursor": cursor, "limit": SKILL_GRAPH_PAGE_SIZE, "since": since},
+    )
+
+
+class SkillGraphStore:
+    """
+    Local, versioned copy of the skill graph held column-wise in a pandas
+    DataFrame indexed by skill name, so the table and the chart render from
+    the same columns without building a dict per row.
+
+    The first load pages through ``get_skill_graph`` with a cursor; later
+    refreshes only ask for skills changed since the stored version. A Jac
+    server that ignores paging and returns a plain list is taken as a full
+    snapshot every time.
+    """
+
+    def __init__(self, fetch=fetch_skill_page):
+        self.fetch = fetch
+        self.version = None
+        self.loaded = False
+        self._frame = pd.DataFrame(columns=SKILL_COLUMNS).set_index("name", drop=False)
+        self._lock = threading.Lock()
+
+    def frame(self) -> pd.DataFrame:
+        return self._frame
+
+    def refresh(self) -> int:
+        """
+        Bring the copy up to date and return how many skills changed
+        """
+        with self._lock:
+            since = self.version or 0
+            pages = []
+            version = self.version
+            cursor = 0
+            while True:
+                page = self.fetch(cursor, since)
+                if isinstance(page, list):
+                    # Server without paging: replace everything
+                    self._replace(self._to_frame([page]))
+                    self.version = None
+                    self.loaded = True
+                    return len(page)
+                if not isinstance(page, dict):
+                    raise ValueError("Unexpected get_skill_graph response")
+                pages.append(page.get("skills") or [])
+                version = page.get("version", version)
+                cursor = page.get("next_cursor")
+                if cursor is None:
+                    break
+
+            changed = self._to_frame(pages)
+            if since == 0:
+                self._replace(changed)
+            elif len(changed):
+                kept = self._frame.drop(index=changed.index, errors="ignore")
+                self._replace(pd.concat([kept, changed]))
+            self.version = version
+            self.loaded = True
+            return len(changed)
+
+    def _to_frame(self, pages) -> pd.DataFrame:
+        frames = [pd.DataFrame.from_records(page) for page in pages if page]
+        if not frames:
+            return self._frame.iloc[0:0]
+        frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        frame = frame.drop_duplicates(subset="name", keep="last")
+        return frame.set_index("name", drop=False)
+
+    def _replace(self, frame: pd.DataFrame):
+        # Swapped in whole, so readers never see a half-applied refresh
+        self._frame = frame.reindex(columns=SKILL_COLUMNS + [
+            column for column in frame.columns if column not in SKILL_COLUMNS
+        ])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_skill_graph_store() -> SkillGraphStore:
+    """
+    Return the process-wide skill graph copy, shared by all sessions
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SkillGraphStore()
+    return _store
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Walkers whose results may be reused: path -> (ttl seconds, shared).
+# Shared results don't depend on who is asking and are reused across all
+# Streamlit sessions; the others are cached per session.
+CACHE_POLICIES = {
+    "career_readiness_agent": (float(os.getenv("WALKER_CACHE_READINESS_TTL", "120")), False),
+    # The path depends only on the target career, so sessions share it
+    "learning_path_agent": (float(os.getenv("WALKER_CACHE_LEARNING_PATH_TTL", "120")), True),
+}
+
+# Walkers that change graph data, mapped to the cached walkers they make stale
+INVALIDATES = {
+    "seed_demo_data": set(CACHE_POLICIES),
+    "market_intelligence_agent": {"career_readiness_agent", "learning_path_agent"},
+}
+
+
+def canonical_payload(payload: dict | None) -> str:
+    return json.dumps(payload or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class WalkerCache:
+    """
+    Process-wide TTL + LRU cache of walker results, bounded both by entry
+    count and by the approximate JSON size of the cached values.
+    """
+
+    def __init__(self, maxsize: int = 512, max_bytes: int = 32 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def key(self, path: str, payload: dict | None, session_id: str | None = None):
+        """
+        Cache key for a walker call, or None when the walker isn't cached
+        """
+        policy = CACHE_POLICIES.get(path)
+        if policy is None:
+            return None
+        _, shared = policy
+        return (path, canonical_payload(payload), None if shared else session_id)
+
+    def get(self, key):
+        """
+        Return ``(True, value)`` for a fresh entry, else ``(False, None)``
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[2]
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        ttl, _ = CACHE_POLICIES[key[0]]
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def invalidate(self, paths=None, session_id: str | None = None):
+        """
+        Drop cached results of ``paths`` (all walkers when None). With a
+        ``session_id`` only that session's entries and shared ones go.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                path, _, owner = key
+                if paths is not None and path not in paths:
+                    continue
+                if session_id is not None and owner not in (None, session_id):
+                    continue
+                self._remove(key)
+
+    def after_call(self, path: str):
+        """
+        Invalidation hook run after every successful walker call
+        """
+        stale = INVALIDATES.get(path)
+        if stale:
+            self.invalidate(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_walker_cache() -> WalkerCache:
+    """
+    Return the process-wide walker cache, sized from the environment
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = WalkerCache(
+                    maxsize=int(os.getenv("WALKER_CACHE_MAX_ENTRIES", "512")),
+                    max_bytes=int(os.getenv("WALKER_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+                )
+    return _cache
@@ -0,0 +1,312 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+JAC_SERVER_URL = os.getenv("JAC_SERVER_URL", "http://localhost:8000")
+
+# (connect, read) timeouts in seconds. LLM-backed walkers get longer reads.
+DEFAULT_TIMEOUT = (
+    float(os.getenv("WALKER_CONNECT_TIMEOUT", "3.05")),
+    float(os.getenv("WALKER_READ_TIMEOUT", "30")),
+)
+WALKER_TIMEOUTS = {
+    "get_skill_graph": (DEFAULT_TIMEOUT[0], 10.0),
+    "mentor_match_agent": (DEFAULT_TIMEOUT[0], 10.0),
+    "content_curator_agent": (DEFAULT_TIMEOUT[0], 60.0),
+    "evaluation_agent": (DEFAULT_TIMEOUT[0], 90.0),
+    "skill_analyzer_agent": (DEFAULT_TIMEOUT[0], 90.0),
+}
+
+# Read-only walkers, safe to call again after a timeout or a dropped connection
+IDEMPOTENT_WALKERS = {
+    "get_skill_graph",
+    "career_readiness_agent",
+    "learning_path_agent",
+    "mentor_match_agent",
+}
+
+# Gateway errors worth another attempt on an idempotent walker
+RETRY_STATUSES = {502, 503, 504}
+
+
+class WalkerError(Exception):
+    pass
+
+
+class CircuitOpenError(WalkerError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast after ``threshold`` consecutive failures, then lets a
+    single trial call through every ``reset_timeout`` seconds until one
+    succeeds.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial_running:
+                raise CircuitOpenError(
+                    f"Jac server unavailable; retrying in {max(remaining, 0):.0f}s"
+                )
+            self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class WalkerClient:
+    """
+    Process-wide client for Jac walkers: one keep-alive connection pool
+    shared by every Streamlit session, per-walker timeouts, retries with
+    jittered backoff for idempotent walkers and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        base_url: str = JAC_SERVER_URL,
+        pool_size: int = 10,
+        retries: int = 2,
+        backoff: float = 0.3,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, path: str, payload: dict | None = None) -> requests.Response:
+        """
+        POST ``payload`` to a walker and return the successful response
+        """
+        timeout = WALKER_TIMEOUTS.get(path, DEFAULT_TIMEOUT)
+        attempts = 1 + (self.retries if path in IDEMPOTENT_WALKERS else 0)
+        url = f"{self.base_url}/walker/{path}"
+
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            try:
+                resp = self.session.post(url, json=payload or {}, timeout=timeout)
+            except requests.RequestException as e:
+                # Any failure must be recorded, or a half-open trial never ends
+                self.breaker.record_failure()
+                retryable = isinstance(e, (requests.ConnectionError, requests.Timeout))
+                if not retryable or attempt + 1 == attempts:
+                    raise WalkerError(str(e)) from e
+            else:
+                if resp.status_code < 500:
+                    self.breaker.record_success()
+                    try:
+                        resp.raise_for_status()
+                    except requests.HTTPError as e:
+                        raise WalkerError(str(e)) from e
+                    return resp
+                self.breaker.record_failure()
+                if resp.status_code not in RETRY_STATUSES or attempt + 1 == attempts:
+                    raise WalkerError(f"{resp.status_code} Server Error for {url}")
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.0))
+        raise WalkerError(f"No attempts made for {path}")
+
+    def call(self, path: str, payload: dict | None = None):
+        """
+        Run a walker and return its first report (or the raw JSON body)
+        """
+        return unwrap_reports(self.post(path, payload).json())
+
+    def stream(self, path: str, payload: dict | None = None) -> "WalkerStream":
+        """
+        Start a walker call that may stream its output. The response is
+        consumed incrementally when the server sends ``text/event-stream``
+        or chunked ``text/plain``; anything else is read as usual.
+        """
+        timeout = WALKER_TIMEOUTS.get(path, DEFAULT_TIMEOUT)
+        url = f"{self.base_url}/walker/{path}"
+        self.breaker.before_call()
+        try:
+            resp = self.session.post(
+                url,
+                json=payload or {},
+                headers={"Accept": "text/event-stream, application/json"},
+                timeout=timeout,
+                stream=True,
+            )
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            raise WalkerError(str(e)) from e
+        if resp.status_code >= 500:
+            self.breaker.record_failure()
+            resp.close()
+            raise WalkerError(f"{resp.status_code} Server Error for {url}")
+        self.breaker.record_success()
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError as e:
+            resp.close()
+            raise WalkerError(str(e)) from e
+        return WalkerStream(resp)
+
+
+class WalkerStream:
+    """
+    An open walker response. When ``streaming`` is true, ``chunks()`` yields
+    text as it arrives; otherwise ``result()`` returns the walker's first
+    report like ``WalkerClient.call``.
+    """
+
+    def __init__(self, resp: requests.Response):
+        self.resp = resp
+        content_type = resp.headers.get("Content-Type", "")
+        self.event_stream = content_type.startswith("text/event-stream")
+        self.streaming = self.event_stream or (
+            content_type.startswith("text/plain")
+            and resp.headers.get("Transfer-Encoding", "").lower() == "chunked"
+        )
+        if self.streaming and "charset=" not in content_type.lower():
+            # requests falls back to ISO-8859-1 for text/*; SSE is always UTF-8
+            resp.encoding = "utf-8"
+
+    def chunks(self):
+        try:
+            if self.event_stream:
+                yield from self._events()
+            else:
+                for chunk in self.resp.iter_content(chunk_size=None, decode_unicode=True):
+                    if chunk:
+                        yield chunk
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise WalkerError(str(e)) from e
+        finally:
+            self.resp.close()
+
+    def _events(self):
+        event, data = "message", []
+        for line in self.resp.iter_lines(decode_unicode=True):
+            if line:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "event":
+                    event = value
+                elif field == "data":
+                    data.append(value)
+                continue
+            if data:
+                text = "\n".join(data)
+                if event == "error":
+                    raise WalkerError(text)
+                if event == "done" or text == "[DONE]":
+                    return
+                yield _event_text(text)
+            event, data = "message", []
+
+    def result(self):
+        try:
+            data = self.resp.json()
+        finally:
+            self.resp.close()
+        return unwrap_reports(data)
+
+
+def unwrap_reports(data):
+    # Jac Cloud wraps walker output as {"status": ..., "reports": [...]}.
+    if isinstance(data, dict) and "reports" in data:
+        reports = data.get("reports") or []
+        return reports[0] if reports else None
+    return data
+
+
+def _event_text(data: str) -> str:
+    # Events carry plain text or JSON such as "..." or {"token": "..."}
+    try:
+        value = json.loads(data)
+    except ValueError:
+        return data
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        for field in ("token", "text", "delta", "content"):
+            if isinstance(value.get(field), str):
+                return value[field]
+    return data
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_walker_client() -> WalkerClient:
+    """
+    Return the process-wide walker client, created from the environment
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = WalkerClient(
+                    pool_size=int(os.getenv("WALKER_POOL_SIZE", "10")),
+                    retries=int(os.getenv("WALKER_RETRIES", "2")),
+                    backoff=float(os.getenv("WALKER_RETRY_BACKOFF", "0.3")),
+                    breaker=CircuitBreaker(
+                        threshold=int(os.getenv("WALKER_BREAKER_THRESHOLD", "5")),
+                        reset_timeout=float(os.getenv("WALKER_BREAKER_RESET", "30")),
+                    ),
+                )
+    return _client
+
+
+_executor = None
+
+
+def get_walker_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide thread pool for concurrent walker calls
+    """
+    global _executor
+    if _executor is None:
+        with _client_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("WALKER_PARALLELISM", "8")),
+                    thread_name_prefix="walker",
+                )
+    return _executor
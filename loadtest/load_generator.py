@@ -0,0 +1,251 @@
+"""
+Open-loop load generator for the notification server: sends a weighted mix
+of /send-connection-notification, /send-password-reset and /get-mentors at
+a fixed rate and reports latency percentiles and error rates per endpoint.
+
+    python loadtest/load_generator.py [--url http://127.0.0.1:8001] [--rps 200]
+                                      [--duration 30] [--mix connection=1,reset=1,mentors=4]
+
+Requests are started on schedule whether or not earlier ones finished, and
+latency is measured from the scheduled start, so a stalled server shows up
+as latency instead of a quietly lower request rate.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:
+    sys.exit("The load generator needs httpx: pip install httpx")
+
+ENDPOINTS = {
+    "connection": ("POST", "/send-connection-notification"),
+    "reset": ("POST", "/send-password-reset"),
+    "mentors": ("GET", "/get-mentors"),
+}
+
+EXPERTISE = ["Python", "SQL", "TensorFlow", "JavaScript", "AWS", "DevOps"]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = {}
+
+    def record(self, latency, status=None, error=None):
+        self.latencies.append(latency)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        else:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    @property
+    def failed(self):
+        return sum(self.errors.values()) + sum(n for status, n in self.statuses.items() if status >= 400)
+
+    def percentile(self, q):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        # Nearest rank
+        return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+    def summary(self, elapsed):
+        return {
+            "requests": self.count,
+            "rps": self.count / elapsed if elapsed else 0.0,
+            "error_rate": self.failed / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": max(self.latencies, default=0.0) * 1000,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+            "errors": dict(self.errors),
+        }
+
+
+class RequestFactory:
+    """
+    Request bodies for each endpoint. Emails are unique per request unless
+    ``repeat`` is set, so idempotency replays stay out of the numbers by default.
+    """
+
+    def __init__(self, repeat=0.0, page_limit=20):
+        self.repeat = repeat
+        self.page_limit = page_limit
+        self._ids = itertools.count()
+
+    def _n(self):
+        if self.repeat and random.random() < self.repeat:
+            return 0
+        return next(self._ids)
+
+    def connection(self):
+        n = self._n()
+        return {"json": {
+            "user_name": f"Load User {n}",
+            "user_email": f"user{n}@loadtest.invalid",
+            "mentor_name": "Anna Mentor",
+            "mentor_email": f"mentor{n % 50}@loadtest.invalid",
+            "message": f"Load test connection request {n}",
+        }}
+
+    def reset(self):
+        n = self._n()
+        return {"json": {
+            "email": f"user{n}@loadtest.invalid",
+            "name": f"Load User {n}",
+            "temp_password": f"tmp-{n:08d}",
+        }}
+
+    def mentors(self):
+        params = {"limit": self.page_limit}
+        if random.random() < 0.5:
+            params["expertise"] = random.choice(EXPERTISE)
+        return {"params": params}
+
+
+def parse_mix(text):
+    weights = {}
+    for entry in text.split(","):
+        name, _, weight = entry.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}; expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    if not any(weights.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one positive weight")
+    return weights
+
+
+async def run_load(url, rps, duration, mix, max_in_flight=1000, timeout=10.0, repeat=0.0, warmup=0.0,
+                   deadline=False):
+    """
+    Drive the server for ``duration`` seconds and return per-endpoint stats
+    """
+    factory = RequestFactory(repeat=repeat)
+    stats = {name: EndpointStats() for name in mix}
+    names, weights = zip(*mix.items())
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    in_flight = 0
+    tasks = set()
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        async def fire(name, scheduled, record):
+            nonlocal in_flight
+            method, path = ENDPOINTS[name]
+            in_flight += 1
+            request = getattr(factory, name)()
+            if deadline:
+                # Tell the server when this client stops waiting
+                request["headers"] = {"X-Request-Deadline": f"{time.time() + timeout:.3f}"}
+            try:
+                resp = await client.request(method, path, **request)
+            except httpx.TimeoutException:
+                if record:
+                    stats[name].record(time.perf_counter() - scheduled, error="timeout")
+            except httpx.HTTPError as e:
+                if record:
+                    stats[name].record(time.perf_counter() - scheduled, error=type(e).__name__)
+            else:
+                if record:
+                    stats[name].record(time.perf_counter() - scheduled, status=resp.status_code)
+            finally:
+                in_flight -= 1
+
+        interval = 1.0 / rps
+        start = time.perf_counter()
+        measure_from = start + warmup
+        end = measure_from + duration
+        for i in itertools.count():
+            scheduled = start + i * interval
+            if scheduled >= end:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = random.choices(names, weights)[0]
+            record = scheduled >= measure_from
+            if in_flight >= max_in_flight:
+                # Client-side limit reached: count it rather than queue it
+                if record:
+                    stats[name].record(0.0, error="client_overload")
+                continue
+            task = asyncio.create_task(fire(name, scheduled, record))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+
+    return stats, duration
+
+
+def print_report(stats, elapsed, target_rps):
+    print(f"\n{'endpoint':<12}{'requests':>9}{'rps':>9}{'errors':>9}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  statuses")
+    total = EndpointStats()
+    for name, endpoint in stats.items():
+        s = endpoint.summary(elapsed)
+        total.latencies.extend(endpoint.latencies)
+        for status, n in endpoint.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + n
+        for error, n in endpoint.errors.items():
+            total.errors[error] = total.errors.get(error, 0) + n
+        _print_row(name, s)
+    _print_row("all", total.summary(elapsed))
+    print(f"\ntarget {target_rps:g} rps over {elapsed:g}s")
+
+
+def _print_row(name, s):
+    outcomes = ", ".join(f"{k}={v}" for k, v in {**s["statuses"], **s["errors"]}.items())
+    print(f"{name:<12}{s['requests']:>9}{s['rps']:>9.1f}{s['error_rate'] * 100:>8.2f}%"
+          f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}  {outcomes}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8001", help="notification server base URL")
+    parser.add_argument("--rps", type=float, default=100.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to measure")
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds of unmeasured load first")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("connection=1,reset=1,mentors=4"),
+                        help="endpoint weights, e.g. connection=1,reset=1,mentors=4")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="client-side cap on open requests")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--repeat", type=float, default=0.0,
+                        help="fraction of email requests that reuse the same payload (idempotency hits)")
+    parser.add_argument("--deadline", action="store_true",
+                        help="send X-Request-Deadline so the server drops requests the client gave up on")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    stats, elapsed = asyncio.run(run_load(
+        args.url, args.rps, args.duration, args.mix,
+        max_in_flight=args.max_in_flight, timeout=args.timeout,
+        repeat=args.repeat, warmup=args.warmup, deadline=args.deadline,
+    ))
+    print_report(stats, elapsed, args.rps)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "target_rps": args.rps,
+                "duration": elapsed,
+                "endpoints": {name: s.summary(elapsed) for name, s in stats.items()},
+            }, f, indent=2)
+
+    failed = sum(s.failed for s in stats.values())
+    return 1 if failed and failed == sum(s.count for s in stats.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+One-shot load test of the notification server: starts the SMTP sink and
+the server (pointed at the sink, with a throwaway outbox), drives it with
+the load generator, then shuts both down and prints the sink's totals.
+
+    python loadtest/run.py [--workers 1] [--smtp-latency 0.05] [--smtp-fail-rate 0.01]
+                           -- [load generator options, e.g. --rps 200 --duration 30]
+
+Rate limits and the digest window are off unless set in the environment,
+so the numbers reflect the server rather than its sending policy.
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.join(HERE, "..", "backend")
+
+sys.path.insert(0, HERE)
+
+import load_generator  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until(check, timeout, what):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{what} did not start within {timeout:g}s")
+
+
+def port_open(port):
+    with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+        return True
+
+
+def healthy(url):
+    with urllib.request.urlopen(f"{url}/health", timeout=1) as resp:
+        return resp.status == 200
+
+
+def stop(proc):
+    if proc.poll() is None:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--smtp-latency", type=float, default=0.0)
+    parser.add_argument("--smtp-jitter", type=float, default=0.0)
+    parser.add_argument("--smtp-fail-rate", type=float, default=0.0)
+    parser.add_argument("--smtp-drop-rate", type=float, default=0.0)
+    parser.add_argument("--transport", default="smtp", help="MAIL_TRANSPORT for the server (smtp, async-smtp, null)")
+
+
+@contextmanager
+def running_server(args, workers=1):
+    """
+    Start the SMTP sink and the server with ``workers`` processes sharing
+    state in a throwaway directory; yield the server URL, then stop both
+    """
+    workdir = tempfile.mkdtemp(prefix="skillforge-load-")
+    smtp_port, http_port = free_port(), free_port()
+    url = f"http://127.0.0.1:{http_port}"
+
+    sink = subprocess.Popen([
+        sys.executable, os.path.join(HERE, "smtp_sink.py"),
+        "--port", str(smtp_port),
+        "--latency", str(args.smtp_latency),
+        "--jitter", str(args.smtp_jitter),
+        "--fail-rate", str(args.smtp_fail_rate),
+        "--drop-rate", str(args.smtp_drop_rate),
+        "--report-every", "3600",
+    ])
+
+    env = dict(os.environ)
+    env.update({
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_STARTTLS": "0",
+        "SMTP_PASSWORD": "",
+        "MAIL_TRANSPORT": args.transport,
+        "OUTBOX_PATH": os.path.join(workdir, "outbox.db"),
+        "NOTIFICATION_WORKERS": str(workers),
+        "SHARED_STATE_PATH": os.path.join(workdir, "shared_state.db"),
+    })
+    for name in ("RATE_LIMIT_ACCOUNT_PER_MIN", "RATE_LIMIT_DOMAIN_PER_MIN", "DIGEST_WINDOW"):
+        env.setdefault(name, "0")
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "notification_server:app",
+        "--host", "127.0.0.1", "--port", str(http_port),
+        "--workers", str(workers), "--log-level", "warning",
+    ], cwd=BACKEND, env=env)
+
+    try:
+        wait_until(lambda: port_open(smtp_port), 10, "SMTP sink")
+        wait_until(lambda: healthy(url), 30, "Notification server")
+        yield url
+        # Give the mail queue a moment to drain before counting deliveries
+        time.sleep(2)
+    finally:
+        stop(server)
+        stop(sink)
+        print(f"outbox kept in {workdir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes")
+    add_server_arguments(parser)
+    parser.add_argument("load_args", nargs=argparse.REMAINDER, help="passed on to load_generator.py")
+    args = parser.parse_args()
+    load_args = args.load_args[1:] if args.load_args[:1] == ["--"] else args.load_args
+
+    with running_server(args, args.workers) as url:
+        return load_generator.main(["--url", url] + load_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
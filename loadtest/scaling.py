@@ -0,0 +1,114 @@
+"""
+Throughput of the notification server by worker process count: for each
+count, starts the SMTP sink and the server (workers sharing state, as in
+production), saturates it from several client processes, and reports
+requests per second, speedup over the first count and efficiency.
+
+    python loadtest/scaling.py [--workers 1,2,4] [--clients 4] [--concurrency 32]
+                               [--duration 10] [--mix connection=1,reset=1,mentors=4]
+
+Unlike the load generator this is closed-loop: every client keeps
+``--concurrency`` requests open, so the server always has work and the
+completion rate is its capacity. Clients need cores too; on a machine with
+fewer cores than workers plus clients the gains flatten out, and the
+report says so.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import load_generator  # noqa: E402
+import run  # noqa: E402
+import httpx  # noqa: E402
+
+
+async def saturate(url, mix, concurrency, duration, warmup):
+    factory = load_generator.RequestFactory()
+    names, weights = zip(*mix.items())
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    completed = 0
+    failed = 0
+    measure_from = time.perf_counter() + warmup
+    end = measure_from + duration
+
+    async with httpx.AsyncClient(base_url=url, timeout=30.0, limits=limits) as client:
+        async def worker():
+            nonlocal completed, failed
+            while time.perf_counter() < end:
+                name = random.choices(names, weights)[0]
+                method, path = load_generator.ENDPOINTS[name]
+                try:
+                    resp = await client.request(method, path, **getattr(factory, name)())
+                    ok = resp.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if time.perf_counter() >= measure_from:
+                    if ok:
+                        completed += 1
+                    else:
+                        failed += 1
+
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return completed, failed
+
+
+def client_process(url, mix, concurrency, duration, warmup):
+    return asyncio.run(saturate(url, mix, concurrency, duration, warmup))
+
+
+def measure(args, workers):
+    with run.running_server(args, workers) as url:
+        with ProcessPoolExecutor(args.clients) as pool:
+            results = list(pool.map(
+                client_process,
+                *zip(*[(url, args.mix, args.concurrency, args.duration, args.warmup)] * args.clients),
+            ))
+    completed = sum(done for done, _ in results)
+    failed = sum(errors for _, errors in results)
+    return {"workers": workers, "rps": completed / args.duration, "completed": completed, "failed": failed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts to compare")
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="open requests per client process")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to measure per worker count")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured load first")
+    parser.add_argument("--mix", type=load_generator.parse_mix, default=load_generator.parse_mix("mentors=1"),
+                        help="endpoint weights, e.g. connection=1,reset=1,mentors=4")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    run.add_server_arguments(parser)
+    parser.set_defaults(transport="null")
+    args = parser.parse_args(argv)
+
+    results = [measure(args, int(workers)) for workers in args.workers.split(",")]
+
+    base = results[0]
+    print(f"\n{'workers':>8}{'rps':>12}{'speedup':>10}{'efficiency':>12}{'failed':>9}")
+    for result in results:
+        speedup = result["rps"] / base["rps"] if base["rps"] else 0.0
+        result["speedup"] = speedup
+        result["efficiency"] = speedup * base["workers"] / result["workers"]
+        print(f"{result['workers']:>8}{result['rps']:>12.1f}{speedup:>9.2f}x{result['efficiency'] * 100:>11.1f}%"
+              f"{result['failed']:>9}")
+    cores = os.cpu_count() or 1
+    busiest = max(result["workers"] for result in results) + args.clients
+    if busiest > cores:
+        print(f"\nnote: {cores} cores for up to {busiest} busy processes; expect less than linear gains")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"cores": cores, "mix": args.mix, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
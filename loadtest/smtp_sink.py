@@ -0,0 +1,167 @@
+"""
+Local SMTP sink for load tests: accepts mail without delivering it, counts
+(and optionally saves) every message, and can inject latency and failures.
+
+    python loadtest/smtp_sink.py [--port 2525] [--latency 0.05] [--jitter 0.02]
+                                 [--fail-rate 0.01] [--drop-rate 0.001] [--save DIR]
+
+Point the notification server at it with SMTP_HOST=127.0.0.1,
+SMTP_PORT=<port>, SMTP_STARTTLS=0 and MAIL_TRANSPORT=smtp (leave
+SMTP_PASSWORD empty; the sink doesn't authenticate).
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import time
+
+
+class SinkStats:
+    def __init__(self):
+        self.connections = 0
+        self.messages = 0
+        self.failed = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+
+    def line(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (f"connections={self.connections} messages={self.messages} "
+                f"failed={self.failed} dropped={self.dropped} "
+                f"bytes={self.bytes} rate={self.messages / elapsed:.1f}/s")
+
+
+class SMTPSink:
+    """
+    Minimal ESMTP server: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, fail_rate=0.0, drop_rate=0.0, save_dir=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.save_dir = save_dir
+        self.stats = SinkStats()
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+
+    async def handle(self, reader, writer):
+        self.stats.connections += 1
+
+        async def reply(line):
+            writer.write(line.encode("ascii") + b"\r\n")
+            await writer.drain()
+
+        try:
+            await reply("220 loadtest-sink ESMTP ready")
+            mail_from, recipients = None, []
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                command = line.decode("ascii", "replace").strip()
+                verb = command[:4].upper()
+                if verb == "EHLO":
+                    writer.write(b"250-loadtest-sink\r\n250-PIPELINING\r\n250-8BITMIME\r\n250 SIZE 52428800\r\n")
+                    await writer.drain()
+                elif verb == "HELO":
+                    await reply("250 loadtest-sink")
+                elif verb == "MAIL":
+                    mail_from, recipients = command[10:].strip(), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command[8:].strip())
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    if mail_from is None or not recipients:
+                        await reply("503 Need MAIL and RCPT first")
+                        continue
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = await self._read_data(reader)
+                    if await self._deliver(data, recipients, reply):
+                        mail_from, recipients = None, []
+                        continue
+                    return  # dropped the connection
+                elif verb == "RSET":
+                    mail_from, recipients = None, []
+                    await reply("250 OK")
+                elif verb == "NOOP":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    return
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_data(self, reader):
+        lines = []
+        while True:
+            line = await reader.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                return b"".join(lines)
+            lines.append(line[1:] if line.startswith(b"..") else line)
+
+    async def _deliver(self, data, recipients, reply):
+        # Returns False when the connection was dropped
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = random.random()
+        if roll < self.drop_rate:
+            self.stats.dropped += 1
+            return False
+        if roll < self.drop_rate + self.fail_rate:
+            self.stats.failed += 1
+            await reply("451 4.3.0 Injected temporary failure")
+            return True
+        self.stats.messages += 1
+        self.stats.bytes += len(data)
+        if self.save_dir:
+            name = f"{time.time():.6f}.{self.stats.messages}.eml"
+            with open(os.path.join(self.save_dir, name), "wb") as f:
+                f.write(data)
+        await reply(f"250 OK queued as {self.stats.messages}")
+        return True
+
+
+async def serve(host, port, sink, report_every):
+    server = await asyncio.start_server(sink.handle, host, port)
+    print(f"SMTP sink listening on {host}:{port}", flush=True)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    async with server:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), report_every)
+            except asyncio.TimeoutError:
+                print(sink.stats.line(), flush=True)
+    print(f"final {sink.stats.line()}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added before answering DATA")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of messages answered 451")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of messages that drop the connection")
+    parser.add_argument("--save", metavar="DIR", help="write every accepted message to DIR")
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between stats lines")
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.latency, args.jitter, args.fail_rate, args.drop_rate, args.save)
+    asyncio.run(serve(args.host, args.port, sink, args.report_every))
+
+
+if __name__ == "__main__":
+    main()
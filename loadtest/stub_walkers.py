@@ -0,0 +1,283 @@
+"""
+Stand-in for ``jac serve``: answers the walkers the Streamlit app calls with
+canned Jac Cloud shaped responses ({"status": 200, "reports": [...]}), with
+optional per-walker latency, injected 5xx errors and streamed LLM output.
+
+    python loadtest/stub_walkers.py [--port 8000] [--latency evaluation_agent=1.5]
+                                    [--fail-rate 0.01] [--stream] [--skills 5000]
+
+Run the app against it with JAC_SERVER_URL=http://127.0.0.1:<port>.
+"""
+import argparse
+import json
+import random
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Same sample data skillforge.jac reports
+BASE_SKILLS = [
+    {"name": "Python", "category": "AI/ML", "difficulty": 3, "market_demand": 0.9},
+    {"name": "TensorFlow", "category": "AI/ML", "difficulty": 7, "market_demand": 0.8},
+    {"name": "SQL", "category": "Data", "difficulty": 4, "market_demand": 0.7},
+    {"name": "JavaScript", "category": "Web", "difficulty": 4, "market_demand": 0.85},
+    {"name": "TypeScript", "category": "Web", "difficulty": 5, "market_demand": 0.8},
+    {"name": "Go", "category": "Backend", "difficulty": 6, "market_demand": 0.75},
+    {"name": "Rust", "category": "Systems", "difficulty": 8, "market_demand": 0.7},
+]
+
+MENTORS = [
+    {"mentor_name": "Anna Mentor", "expertise": ["Python", "TensorFlow", "Machine Learning"],
+     "score": 0.9, "overlap": 3, "rating": 4.8, "availability": 85},
+    {"mentor_name": "Bob Guide", "expertise": ["SQL", "Data Engineering", "Python"],
+     "score": 0.85, "overlap": 2, "rating": 4.6, "availability": 70},
+    {"mentor_name": "Carol Expert", "expertise": ["JavaScript", "React", "Web Development"],
+     "score": 0.75, "overlap": 1, "rating": 4.9, "availability": 90},
+    {"mentor_name": "David Coach", "expertise": ["Cloud Architecture", "AWS", "DevOps"],
+     "score": 0.65, "overlap": 1, "rating": 4.7, "availability": 60},
+]
+
+REQUIRED_SKILLS = {
+    "AI Engineer": ["Python", "TensorFlow", "SQL"],
+    "Data Engineer": ["Python", "SQL"],
+    "Web Developer": ["JavaScript", "TypeScript", "SQL"],
+}
+
+LEARNING_PATHS = {
+    "AI Engineer": ["Python Foundations", "Intro to ML with TensorFlow"],
+    "Data Engineer": ["Python Foundations", "SQL for Analytics"],
+    "Web Developer": ["Modern JavaScript", "Frontend Frameworks"],
+}
+
+WALKERS = {
+    "career_readiness_agent",
+    "learning_path_agent",
+    "get_skill_graph",
+    "content_curator_agent",
+    "evaluation_agent",
+    "mentor_match_agent",
+}
+
+# Walkers whose real implementation is an LLM call, streamable with --stream
+LLM_WALKERS = {"content_curator_agent", "evaluation_agent"}
+
+
+def synthetic_skills(count):
+    skills = [dict(skill, version=1) for skill in BASE_SKILLS[:count]]
+    for i in range(len(skills), count):
+        skills.append({
+            "name": f"Skill {i}",
+            "category": random.choice(["AI/ML", "Data", "Web", "Backend", "Systems"]),
+            "difficulty": random.randint(1, 10),
+            "market_demand": round(random.uniform(0.1, 1.0), 2),
+            "version": 1,
+        })
+    return skills
+
+
+class WalkerStub:
+    def __init__(self, skills=len(BASE_SKILLS), latency=None, default_latency=0.0,
+                 fail_rate=0.0, stream=False, token_delay=0.02, churn=0):
+        self.skills = synthetic_skills(skills)
+        self.version = 1
+        self.latency = latency or {}
+        self.default_latency = default_latency
+        self.fail_rate = fail_rate
+        self.stream = stream
+        self.token_delay = token_delay
+        self.churn = churn
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def bump_version(self):
+        # Marks ``churn`` random skills as changed, for delta refreshes
+        with self._lock:
+            self.version += 1
+            for skill in random.sample(self.skills, min(self.churn, len(self.skills))):
+                skill["market_demand"] = round(random.uniform(0.1, 1.0), 2)
+                skill["version"] = self.version
+
+    def get_skill_graph(self, body):
+        cursor = int(body.get("cursor") or 0)
+        limit = int(body.get("limit") or 0)
+        since = int(body.get("since") or 0)
+        with self._lock:
+            if limit == 0 and since == 0:
+                return [dict(skill) for skill in self.skills]
+            changed = [dict(skill) for skill in self.skills if skill["version"] > since]
+            version = self.version
+        end = len(changed)
+        next_cursor = None
+        if limit > 0 and cursor + limit < end:
+            end = next_cursor = cursor + limit
+        return {"skills": changed[cursor:end], "next_cursor": next_cursor, "version": version}
+
+    def career_readiness_agent(self, body):
+        required = REQUIRED_SKILLS.get(body.get("target_career_title"), ["Python"])
+        return sum(1 for skill in required if skill in ("Python", "SQL")) / len(required)
+
+    def learning_path_agent(self, body):
+        return LEARNING_PATHS.get(body.get("target_career_title"), ["Python Foundations"])
+
+    def mentor_match_agent(self, body):
+        return MENTORS
+
+    def content_curator_agent(self, body):
+        skill = body.get("skill_name", "Python")
+        level = body.get("level", "beginner")
+        return {
+            "title": f"{level.title()} {skill} challenge",
+            "prompt": (f"Write a {skill} function that returns the n-th Fibonacci number. "
+                       f"Aim for a {level} level solution with tests."),
+            "level": level,
+        }
+
+    def evaluation_agent(self, body):
+        code = body.get("code", "")
+        return {
+            "score": min(100, 40 + len(code) % 60),
+            "feedback": (f"Your {body.get('skill_name', 'Python')} solution is readable. "
+                         "Consider handling edge cases and adding tests."),
+        }
+
+    def text_of(self, result):
+        if isinstance(result, dict):
+            return result.get("prompt") or result.get("feedback") or json.dumps(result)
+        return str(result)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like jac serve behind uvicorn
+    stub = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send_json(200, {"status": "ok", "calls": self.stub.calls})
+        else:
+            self._send_json(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not self.path.startswith("/walker/"):
+            self._send_json(404, {"detail": "Not Found"})
+            return
+        name = self.path[len("/walker/"):].split("?", 1)[0].strip("/")
+        handler = getattr(self.stub, name, None) if name in WALKERS else None
+        if handler is None:
+            self._send_json(404, {"detail": f"Walker {name} not found"})
+            return
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            self._send_json(422, {"detail": "Invalid JSON"})
+            return
+
+        stub = self.stub
+        stub.count(name)
+        delay = stub.latency.get(name, stub.default_latency)
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < stub.fail_rate:
+            self._send_json(503, {"detail": "Injected failure"})
+            return
+
+        result = handler(body)
+        accept = self.headers.get("Accept", "")
+        if stub.stream and name in LLM_WALKERS and "text/event-stream" in accept:
+            self._send_events(stub.text_of(result))
+        else:
+            self._send_json(200, {"status": 200, "reports": [result]})
+
+    def _send_events(self, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            token = word if i == 0 else " " + word
+            self.wfile.write(f"data: {json.dumps({'token': token})}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.stub.token_delay)
+        self.wfile.write(b"event: done\ndata: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def parse_latency(values):
+    latency = {}
+    for value in values:
+        name, _, seconds = value.partition("=")
+        if name not in WALKERS or not seconds:
+            raise argparse.ArgumentTypeError(f"expected WALKER=SECONDS, got {value!r}")
+        latency[name] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", action="append", default=[], metavar="WALKER=SECONDS",
+                        help="delay before answering a walker (repeatable)")
+    parser.add_argument("--default-latency", type=float, default=0.0,
+                        help="delay for walkers without their own --latency")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of calls answered 503")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream content_curator_agent and evaluation_agent as server-sent events")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed tokens")
+    parser.add_argument("--skills", type=int, default=len(BASE_SKILLS), help="size of the skill graph")
+    parser.add_argument("--churn", type=int, default=0,
+                        help="skills changed per --churn-every seconds, for delta refreshes")
+    parser.add_argument("--churn-every", type=float, default=10.0)
+    args = parser.parse_args()
+
+    StubHandler.stub = stub = WalkerStub(
+        skills=args.skills,
+        latency=parse_latency(args.latency),
+        default_latency=args.default_latency,
+        fail_rate=args.fail_rate,
+        stream=args.stream,
+        token_delay=args.token_delay,
+        churn=args.churn,
+    )
+    if args.churn:
+        def churn():
+            while True:
+                time.sleep(args.churn_every)
+                stub.bump_version()
+        threading.Thread(target=churn, daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    print(f"Stub walkers listening on http://{args.host}:{args.port}", flush=True)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"calls {json.dumps(stub.calls)}", flush=True)
+
+
+if __name__ == "__main__":
+    main()